@@ -1,10 +1,14 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, request, jsonify, render_template, send_from_directory, Response
 from flask_cors import CORS
 import os
+import json
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
+from PIL import Image
 
 # Import our analysis modules
 from modules.text_analyzer import TextAnalyzer
@@ -15,6 +19,15 @@ from modules.educational_content import EducationalContent
 from modules.advanced_ai_analyzer import AdvancedAIAnalyzer
 from modules.realtime_fact_checker import RealTimeFactChecker
 from modules.indian_context_detector import IndianMisinfoDetector
+from modules.keyword_engine import get_keyword_engine
+from modules.document import AnalyzedDocument
+from modules.disk_cache import get_disk_cache
+from modules.cache import TTLCache
+from modules.normalization import content_fingerprint
+from modules.near_duplicate import NearDuplicateIndex
+from modules.single_flight import SingleFlight
+from modules.metrics import metrics
+from modules.layer_executor import AnalysisLayer, LayerExecutor
 
 # Load environment variables
 load_dotenv()
@@ -26,7 +39,8 @@ CORS(app, resources={
     r"/api/*": {
         "origins": "*",
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type", "X-Deadline-Ms"],
+        "expose_headers": ["X-Cache"]
     }
 })
 
@@ -47,6 +61,75 @@ advanced_analyzer = AdvancedAIAnalyzer()
 fact_checker = RealTimeFactChecker()
 indian_context = IndianMisinfoDetector()
 
+# Shared keyword automaton, populated by the analyzers above
+keyword_engine = get_keyword_engine()
+keyword_engine.build()
+
+# Bounded pool that runs the text analysis layers concurrently
+layer_executor = LayerExecutor()
+
+# Complete text analysis responses keyed by canonical content fingerprint,
+# so repeat forwards of the same message skip every layer
+text_result_cache = TTLCache(
+    max_entries=int(os.getenv('RESULT_CACHE_SIZE', 5000)),
+    ttl=float(os.getenv('RESULT_CACHE_TTL', 3600)),
+    max_bytes=int(os.getenv('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    name='text_results',
+    disk=get_disk_cache()
+)
+
+# Recently analyzed texts, so lightly edited forwards reuse an earlier verdict
+near_duplicate_index = NearDuplicateIndex(
+    threshold=float(os.getenv('NEAR_DUP_THRESHOLD', 0.8)),
+    max_entries=int(os.getenv('NEAR_DUP_MAX_ENTRIES', 10000)),
+    ttl=float(os.getenv('NEAR_DUP_TTL', os.getenv('RESULT_CACHE_TTL', 3600)))
+) if os.getenv('NEAR_DUP_ENABLED', 'true').lower() == 'true' else None
+
+# Individual layer results keyed by (fingerprint, layer name). Layers that
+# miss a request deadline finish in the background and land here, so the
+# next request for the same text gets them for free
+layer_result_cache = TTLCache(
+    max_entries=int(os.getenv('LAYER_CACHE_SIZE', 10000)),
+    ttl=float(os.getenv('RESULT_CACHE_TTL', 3600)),
+    max_bytes=int(os.getenv('LAYER_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    name='layer_results'
+)
+
+# Concurrent identical requests share one in-flight analysis
+text_flight = SingleFlight('text_analysis')
+url_flight = SingleFlight('url_analysis')
+
+# Separate pool for batch items, so batches can't starve the layer pool
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 1000))
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+batch_pool = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_MAX_WORKERS', 4)),
+                                thread_name_prefix='batch-item')
+
+# Per-layer time budgets in seconds (None waits for the layer to finish)
+LAYER_TIMEOUTS = {
+    'basic': None,
+    'indian_context': float(os.getenv('INDIAN_CONTEXT_LAYER_TIMEOUT', 5)),
+    'advanced': float(os.getenv('ADVANCED_LAYER_TIMEOUT', 10)),
+    'fact_checking': float(os.getenv('FACT_CHECK_LAYER_TIMEOUT', 35)),
+    'ai': float(os.getenv('AI_LAYER_TIMEOUT', 30))
+}
+
+# Composite risk weights, in the order the weighted sum is taken
+LAYER_WEIGHTS = {
+    'basic': 0.15,
+    'advanced': 0.3,
+    'fact_checking': 0.25,
+    'ai': 0.15,
+    'indian_context': 0.15
+}
+
+# Cascade mode: the cheap rule-based tier runs first, and the expensive tier
+# (fact-checking fan-out and Gemini) only when the cheap composite score
+# falls inside the uncertainty band
+RULES_TIER = ('basic', 'indian_context', 'advanced')
+CASCADE_DEFAULT = os.getenv('CASCADE_DEFAULT', 'false').lower() == 'true'
+CASCADE_BAND = (float(os.getenv('CASCADE_BAND_LOW', 10)), float(os.getenv('CASCADE_BAND_HIGH', 25)))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -98,6 +181,26 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Misinformation Detector API is running'})
 
+@app.route('/api/metrics')
+def get_metrics():
+    """Cache statistics for monitoring"""
+    disk_cache = get_disk_cache()
+    return jsonify({
+        'caches': {
+            'text_results': text_result_cache.stats(),
+            'layer_results': layer_result_cache.stats(),
+            'fact_check_claims': fact_checker.cache.stats(),
+            'gemini_results': gemini_analyzer.cache.stats(),
+            'url_content': url_analyzer.content_cache.stats(),
+            'image_analysis': image_analyzer.cache.stats()
+        },
+        'near_duplicates': near_duplicate_index.stats() if near_duplicate_index is not None else None,
+        'gemini_client': gemini_analyzer.client.stats() if gemini_analyzer.client is not None else None,
+        'url_batch': url_analyzer.batch_stats(),
+        **metrics.snapshot(),
+        'disk': disk_cache.stats() if disk_cache is not None else None
+    })
+
 @app.route('/api/analyze/text', methods=['POST', 'OPTIONS'])
 def analyze_text():
     """Advanced text analysis with multi-layered AI and fact-checking"""
@@ -118,102 +221,349 @@ def analyze_text():
         if len(text.strip()) == 0:
             return jsonify({'error': 'Empty text provided'}), 400
         
-        logger.info(f"Analyzing text content: {text[:100]}...")
-        
-        # Perform basic text analysis
-        basic_analysis = text_analyzer.analyze(text)
-        
-        # Advanced AI analysis
-        try:
-            advanced_analysis = advanced_analyzer.analyze_comprehensive(text, 'text')
-        except Exception as ai_error:
-            logger.warning(f"Advanced AI analysis failed: {str(ai_error)}")
-            advanced_analysis = {'error': 'Advanced analysis unavailable'}
-        
-        # Real-time fact checking
-        try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            fact_check_results = loop.run_until_complete(
-                fact_checker.check_claims_comprehensive(text, 'text')
-            )
-            loop.close()
-        except Exception as fact_error:
-            logger.warning(f"Fact-checking failed: {str(fact_error)}")
-            fact_check_results = {'error': 'Fact-checking unavailable'}
-        
-        # Try Gemini AI analysis with fallback
-        ai_analysis = {'risk_score': 0, 'red_flags': [], 'ai_confidence': 'Not available'}
         try:
-            ai_analysis = gemini_analyzer.analyze_text(text)
-        except Exception as ai_error:
-            logger.warning(f"Gemini AI analysis failed: {str(ai_error)}")
-            ai_analysis['explanation'] = "AI analysis temporarily unavailable"
+            deadline_ms = _parse_deadline_ms(data.get('deadline_ms', request.headers.get('X-Deadline-Ms')))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Indian context analysis
-        indian_analysis = {}
         try:
-            indian_analysis = indian_context.analyze_indian_context(text)
-        except Exception as indian_error:
-            logger.warning(f"Indian context analysis failed: {str(indian_error)}")
-            indian_analysis = {'error': 'Indian context analysis unavailable'}
-        
-        # Calculate composite risk score
-        basic_risk = basic_analysis['risk_score']
-        advanced_risk = advanced_analysis.get('risk_assessment', {}).get('overall_risk_score', 0)
-        fact_check_risk = 100 - fact_check_results.get('overall_credibility', 50)
-        ai_risk = ai_analysis.get('risk_score', 0)
-        indian_risk = indian_analysis.get('india_specific_risk', 0)
-        
-        # Weighted average of all risk scores (including Indian context)
-        final_risk_score = int(
-            (basic_risk * 0.15) + 
-            (advanced_risk * 0.3) + 
-            (fact_check_risk * 0.25) + 
-            (ai_risk * 0.15) +
-            (indian_risk * 0.15)
-        )
-        
-        # Combine all red flags
-        all_red_flags = basic_analysis['red_flags'] + ai_analysis.get('red_flags', [])
-        if advanced_analysis.get('detailed_analysis', {}).get('linguistic', {}).get('detected_patterns'):
-            all_red_flags.extend(advanced_analysis['detailed_analysis']['linguistic']['detected_patterns'][:3])
-        if indian_analysis.get('regional_patterns'):
-            all_red_flags.extend(indian_analysis['regional_patterns'][:2])
-        
-        # Build comprehensive result
-        result = {
-            'type': 'text',
-            'content': text[:200] + '...' if len(text) > 200 else text,
-            'risk_score': final_risk_score,
-            'analysis': {
-                'basic': basic_analysis,
-                'advanced': advanced_analysis,
-                'fact_checking': fact_check_results,
-                'ai': ai_analysis
-            },
-            'indian_context': indian_analysis,
-            'red_flags': list(set(all_red_flags))[:10],  # Remove duplicates, limit to 10
-            'educational_tips': educational_content.get_tips_for_text()[:5],
-            'verification_suggestions': educational_content.get_verification_suggestions('text', final_risk_score),
-            'confidence_score': advanced_analysis.get('confidence_score', 0.7),
-            'processing_summary': {
-                'total_processing_time': (
-                    advanced_analysis.get('processing_time', 0) + 
-                    fact_check_results.get('processing_time', 0)
-                ),
-                'fact_checks_performed': fact_check_results.get('total_claims', 0),
-                'analysis_layers': 5  # Increased to include Indian context
-            }
-        }
+            cascade_band = _parse_cascade_band(data.get('cascade', CASCADE_DEFAULT), data.get('cascade_band'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(result)
+        result, cache_status = _analyze_text_cached(text, deadline_ms, cascade_band)
+        response = jsonify(result)
+        response.headers['X-Cache'] = cache_status
+        return response
         
     except Exception as e:
         logger.error(f"Error analyzing text: {str(e)}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
+def _parse_deadline_ms(value):
+    """Validate an optional latency budget in milliseconds"""
+    if value is None:
+        return None
+    try:
+        deadline_ms = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('deadline_ms must be a number of milliseconds')
+    if deadline_ms <= 0:
+        raise ValueError('deadline_ms must be positive')
+    return deadline_ms
+
+def _parse_cascade_band(cascade, band):
+    """Uncertainty band (low, high) when cascade mode is on, else None"""
+    if band is not None:
+        if not isinstance(band, (list, tuple)) or len(band) != 2 or \
+                not all(isinstance(bound, (int, float)) for bound in band) or band[0] > band[1]:
+            raise ValueError('cascade_band must be [low, high] risk scores')
+        return (float(band[0]), float(band[1]))
+    return CASCADE_BAND if cascade else None
+
+def _analyze_text_cached(text, deadline_ms=None, cascade_band=None):
+    """
+    Analyze text through the response cache, near-duplicate index and
+    in-flight coalescing
+    
+    Args:
+        text: Text to analyze
+        deadline_ms: Optional latency budget; layers still running when it
+            passes are left out of a partial result
+        cascade_band: Optional (low, high) band; when given, the expensive
+            layers only run if the rule-based score falls inside it
+    
+    Returns:
+        Tuple of (result, cache status: 'hit', 'near-hit' or 'miss')
+    """
+    fingerprint = content_fingerprint(text)
+    cached = _lookup_text_result(text, fingerprint)
+    if cached is not None:
+        return cached
+    
+    # Requests with a different budget or band may produce different results
+    flight_key = fingerprint
+    if deadline_ms is not None or cascade_band is not None:
+        flight_key = (fingerprint, deadline_ms, cascade_band)
+    result = text_flight.do(flight_key, lambda: _run_text_analysis(text, fingerprint, deadline_ms, cascade_band))
+    
+    # Coalesced callers share the leader's result; echo their own text
+    return dict(result, content=_content_excerpt(text)), 'miss'
+
+def _lookup_text_result(text, fingerprint):
+    """Cached or near-duplicate result for text as (result, status), or None"""
+    cached = text_result_cache.get(fingerprint)
+    if cached is not None:
+        return dict(cached, content=_content_excerpt(text)), 'hit'
+    
+    match = near_duplicate_index.query(text) if near_duplicate_index is not None else None
+    if match is not None:
+        _, matched_result, similarity = match
+        return dict(
+            matched_result,
+            content=_content_excerpt(text),
+            near_duplicate={
+                'matched_content': matched_result['content'],
+                'similarity': round(similarity, 3)
+            }
+        ), 'near-hit'
+    
+    return None
+
+def _create_document(text):
+    """Shared document for the analysis layers"""
+    # Lowercasing, tokens, sentences and the keyword scan are computed
+    # once and reused by every analyzer
+    document = AnalyzedDocument(text, keyword_engine)
+    document.keyword_hits  # scan once before the layers share it
+    return document
+
+def _run_text_analysis(text, fingerprint, deadline_ms=None, cascade_band=None):
+    """Run the text analysis layers and cache the composed result"""
+    logger.info(f"Analyzing text content: {text[:100]}...")
+    
+    text_layers, layers = _prepare_text_layers(text, fingerprint)
+    deadline = deadline_ms / 1000 if deadline_ms is not None else None
+    
+    if cascade_band is None:
+        # Run the remaining layers concurrently
+        layers.update(layer_executor.run(text_layers, deadline))
+        result = _compose_text_result(text, layers)
+    else:
+        result = _run_text_cascade(text, text_layers, layers, deadline, cascade_band)
+    
+    _store_text_result(text, fingerprint, layers, result)
+    return result
+
+def _run_text_cascade(text, text_layers, layers, deadline, cascade_band):
+    """Run the rule-based tier, then the expensive tier only if its score is uncertain"""
+    start_time = time.monotonic()
+    layers.update(layer_executor.run([layer for layer in text_layers if layer.name in RULES_TIER], deadline))
+    tiers_run = ['rules']
+    
+    rules_risk_score = _composite_risk_score({name: layers[name] for name in RULES_TIER if name in layers})
+    low, high = cascade_band
+    if low <= rules_risk_score <= high:
+        remaining = None if deadline is None else max(0.0, deadline - (time.monotonic() - start_time))
+        layers.update(layer_executor.run([layer for layer in text_layers if layer.name not in RULES_TIER],
+                                         remaining))
+        tiers_run.append('deep')
+    
+    skipped_layers = [] if 'deep' in tiers_run else \
+        [name for name in LAYER_WEIGHTS if name not in RULES_TIER and name not in layers]
+    result = _compose_text_result(text, layers, skipped_layers)
+    result['cascade'] = {
+        'tiers_run': tiers_run,
+        'rules_risk_score': rules_risk_score,
+        'band': [low, high],
+        'skipped_layers': skipped_layers
+    }
+    return result
+
+def _prepare_text_layers(text, fingerprint):
+    """
+    Split the text layers into ones with a cached result and ones to run
+    
+    Returns:
+        Tuple of (layers to run, {name: cached result})
+    """
+    cached_layers = {}
+    for name in LAYER_WEIGHTS:
+        cached = layer_result_cache.get((fingerprint, name))
+        if cached is not None:
+            cached_layers[name] = cached
+    
+    if len(cached_layers) == len(LAYER_WEIGHTS):
+        return [], cached_layers
+    
+    text_layers = [layer for layer in _build_text_layers(_create_document(text), fingerprint)
+                   if layer.name not in cached_layers]
+    return text_layers, cached_layers
+
+def _store_text_result(text, fingerprint, layers, result):
+    """Cache a composed result unless it lacks layers or one of its layers is degraded"""
+    # Partial and cascade results are rebuilt cheaply from the layer cache
+    if len(layers) < len(LAYER_WEIGHTS):
+        return
+    # Don't pin a degraded verdict (a layer that failed, timed out or only
+    # had a stand-in answer) in the cache for the whole TTL
+    if any(_is_degraded(layer_result) for layer_result in layers.values()):
+        return
+    # Cascade details describe this request, not the verdict
+    result = {key: value for key, value in result.items() if key != 'cascade'}
+    text_result_cache.set(fingerprint, result)
+    if near_duplicate_index is not None:
+        near_duplicate_index.add(fingerprint, text, result)
+
+def _is_degraded(layer_result):
+    """True for a layer fallback or a stand-in answer given while an upstream was failing"""
+    return bool(layer_result.get('degraded'))
+
+@app.route('/api/analyze/text/stream', methods=['GET', 'POST'])
+def analyze_text_stream():
+    """Text analysis as server-sent events: one 'layer' event per layer, then 'result'"""
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args
+    text = (data or {}).get('text')
+    if not isinstance(text, str):
+        return jsonify({'error': 'No text provided'}), 400
+    if len(text.strip()) == 0:
+        return jsonify({'error': 'Empty text provided'}), 400
+    
+    def generate():
+        try:
+            fingerprint = content_fingerprint(text)
+            cached = _lookup_text_result(text, fingerprint)
+            if cached is not None:
+                result, cache_status = cached
+                for name, layer_result in _layers_of_result(result).items():
+                    yield _sse('layer', {'layer': name, 'result': layer_result})
+                yield _sse('result', dict(result, cache=cache_status))
+                return
+            
+            logger.info(f"Streaming text analysis: {text[:100]}...")
+            text_layers, layers = _prepare_text_layers(text, fingerprint)
+            for name, layer_result in layers.items():
+                yield _sse('layer', {'layer': name, 'result': layer_result})
+            for name, layer_result in layer_executor.iter_completed(text_layers):
+                layers[name] = layer_result
+                yield _sse('layer', {'layer': name, 'result': layer_result})
+            
+            result = _compose_text_result(text, layers)
+            _store_text_result(text, fingerprint, layers, result)
+            yield _sse('result', dict(result, cache='miss'))
+            
+        except Exception as e:
+            logger.error(f"Error streaming text analysis: {str(e)}")
+            yield _sse('error', {'error': 'Internal server error', 'details': str(e)})
+    
+    return Response(generate(), mimetype='text/event-stream',
+                     headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _sse(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _layers_of_result(result):
+    """Per-layer results contained in a composed text result"""
+    return {
+        'basic': result['analysis']['basic'],
+        'indian_context': result['indian_context'],
+        'advanced': result['analysis']['advanced'],
+        'fact_checking': result['analysis']['fact_checking'],
+        'ai': result['analysis']['ai']
+    }
+
+def _build_text_layers(document, fingerprint):
+    """Describe the five text analysis layers for the layer executor"""
+    layers = [
+        AnalysisLayer('basic', lambda: text_analyzer.analyze(document),
+                      timeout=LAYER_TIMEOUTS['basic']),
+        AnalysisLayer('advanced', lambda: advanced_analyzer.analyze_comprehensive(document, 'text'),
+                      fallback={'error': 'Advanced analysis unavailable', 'degraded': True},
+                      timeout=LAYER_TIMEOUTS['advanced']),
+        AnalysisLayer('fact_checking', lambda: fact_checker.check_claims(document, 'text'),
+                      fallback={'error': 'Fact-checking unavailable', 'degraded': True},
+                      timeout=LAYER_TIMEOUTS['fact_checking']),
+        AnalysisLayer('ai', lambda: gemini_analyzer.analyze_text(document, timeout=LAYER_TIMEOUTS['ai']),
+                      fallback={'risk_score': 0, 'red_flags': [], 'ai_confidence': 'Not available',
+                                'explanation': 'AI analysis temporarily unavailable', 'degraded': True},
+                      timeout=LAYER_TIMEOUTS['ai']),
+        AnalysisLayer('indian_context', lambda: indian_context.analyze_indian_context(document),
+                      fallback={'error': 'Indian context analysis unavailable', 'degraded': True},
+                      timeout=LAYER_TIMEOUTS['indian_context'])
+    ]
+    for layer in layers:
+        layer.func = _caching_layer_func(fingerprint, layer.name, layer.func)
+    return layers
+
+def _caching_layer_func(fingerprint, name, func):
+    """Wrap a layer so its result is cached even after the request stopped waiting"""
+    def run():
+        result = func()
+        # A stand-in answer from a failing upstream is retried next time
+        if not _is_degraded(result):
+            layer_result_cache.set((fingerprint, name), result)
+        return result
+    return run
+
+def _content_excerpt(text):
+    """Leading part of the submitted text echoed back in the response"""
+    return text[:200] + '...' if len(text) > 200 else text
+
+def _composite_risk_score(layers):
+    """Weighted average of the layer risk scores, re-weighted over the layers present"""
+    layer_risks = {
+        'basic': lambda result: result['risk_score'],
+        'advanced': lambda result: result.get('risk_assessment', {}).get('overall_risk_score', 0),
+        'fact_checking': lambda result: 100 - result.get('overall_credibility', 50),
+        'ai': lambda result: result.get('risk_score', 0),
+        'indian_context': lambda result: result.get('india_specific_risk', 0)
+    }
+    
+    weighted_risk = 0
+    available_weight = 0
+    for name, weight in LAYER_WEIGHTS.items():
+        if name in layers:
+            weighted_risk += layer_risks[name](layers[name]) * weight
+            available_weight += weight
+    
+    # Only divide when layers are missing, so full results score exactly as before
+    if len(layers) < len(LAYER_WEIGHTS):
+        weighted_risk = weighted_risk / available_weight if available_weight else 0
+    return int(weighted_risk)
+
+def _compose_text_result(text, layers, skipped_layers=()):
+    """
+    Combine per-layer results into the text analysis response
+    
+    Layers absent from layers and not deliberately skipped are reported as missing
+    """
+    basic_analysis = layers.get('basic', {})
+    advanced_analysis = layers.get('advanced', {})
+    fact_check_results = layers.get('fact_checking', {})
+    ai_analysis = layers.get('ai', {})
+    indian_analysis = layers.get('indian_context', {})
+    
+    # Weighted average of all risk scores (including Indian context)
+    final_risk_score = _composite_risk_score(layers)
+    missing_layers = [name for name in LAYER_WEIGHTS if name not in layers and name not in skipped_layers]
+    
+    # Combine all red flags
+    all_red_flags = basic_analysis.get('red_flags', []) + ai_analysis.get('red_flags', [])
+    if advanced_analysis.get('detailed_analysis', {}).get('linguistic', {}).get('detected_patterns'):
+        all_red_flags.extend(advanced_analysis['detailed_analysis']['linguistic']['detected_patterns'][:3])
+    if indian_analysis.get('regional_patterns'):
+        all_red_flags.extend(indian_analysis['regional_patterns'][:2])
+    
+    # Build comprehensive result
+    result = {
+        'type': 'text',
+        'content': _content_excerpt(text),
+        'risk_score': final_risk_score,
+        'analysis': {
+            name: layers[name] for name in ('basic', 'advanced', 'fact_checking', 'ai') if name in layers
+        },
+        'indian_context': layers.get('indian_context'),
+        'red_flags': list(set(all_red_flags))[:10],  # Remove duplicates, limit to 10
+        'educational_tips': educational_content.get_tips_for_text()[:5],
+        'verification_suggestions': educational_content.get_verification_suggestions('text', final_risk_score),
+        'confidence_score': advanced_analysis.get('confidence_score', 0.7),
+        'processing_summary': {
+            'total_processing_time': (
+                advanced_analysis.get('processing_time', 0) + 
+                fact_check_results.get('processing_time', 0)
+            ),
+            'fact_checks_performed': fact_check_results.get('total_claims', 0),
+            'analysis_layers': len(layers)  # Five including Indian context, fewer when partial
+        }
+    }
+    
+    if missing_layers:
+        result['partial'] = True
+        result['missing_layers'] = missing_layers
+    
+    return result
+
 @app.route('/api/analyze/url', methods=['POST'])
 def analyze_url():
     """Analyze URL content for misinformation"""
@@ -223,31 +573,10 @@ def analyze_url():
             return jsonify({'error': 'No URL provided'}), 400
         
         url = data['url']
-        logger.info(f"Analyzing URL: {url}")
-        
-        # Analyze URL and extract content
-        url_analysis = url_analyzer.analyze(url)
-        
-        if url_analysis.get('error'):
-            return jsonify({'error': url_analysis['error']}), 400
+        result = url_flight.do(url, lambda: _run_url_analysis(url))
         
-        # Get AI analysis of the extracted content
-        ai_analysis = gemini_analyzer.analyze_text(url_analysis.get('content', ''))
-        
-        # Combine results
-        result = {
-            'type': 'url',
-            'url': url,
-            'title': url_analysis.get('title', 'Unknown'),
-            'risk_score': max(url_analysis['risk_score'], ai_analysis.get('risk_score', 0)),
-            'analysis': {
-                'url': url_analysis,
-                'ai': ai_analysis
-            },
-            'red_flags': url_analysis['red_flags'] + ai_analysis.get('red_flags', []),
-            'educational_tips': educational_content.get_tips_for_urls(),
-            'verification_suggestions': educational_content.get_verification_suggestions()
-        }
+        if result.get('error'):
+            return jsonify({'error': result['error']}), 400
         
         return jsonify(result)
         
@@ -255,6 +584,159 @@ def analyze_url():
         logger.error(f"Error analyzing URL: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze many texts/URLs, streaming one NDJSON line per item as it finishes"""
+    if request.mimetype != 'application/json' and request.mimetype not in NDJSON_MIMETYPES:
+        return jsonify({'error': 'Send a JSON array (application/json) or NDJSON (application/x-ndjson)'}), 415
+    
+    try:
+        items = _parse_batch_items(request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not items:
+        return jsonify({'error': 'No items provided'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many items. Maximum batch size is {BATCH_MAX_ITEMS}'}), 413
+    
+    logger.info(f"Analyzing batch of {len(items)} items")
+    # URL items fetch their pages within the URL analyzer's global and
+    # per-host limits, then join the batch pool for the AI layer
+    url_indices = [index for index, item in enumerate(items) if _batch_item_url(item) is not None]
+    fetches = dict(zip(url_indices, url_analyzer.submit_many([_batch_item_url(items[index])
+                                                              for index in url_indices])))
+    futures = {}
+    for index, item in enumerate(items):
+        if index in fetches:
+            futures[_when_fetched(fetches[index], item)] = index
+        else:
+            futures[batch_pool.submit(_analyze_batch_item, item)] = index
+    
+    def generate():
+        try:
+            for future in as_completed(futures):
+                line = {'index': futures[future]}
+                line.update(future.result())
+                yield json.dumps(line) + '\n'
+        finally:
+            # Client went away: drop the items and page fetches that haven't started
+            for future in list(futures) + list(fetches.values()):
+                future.cancel()
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def _parse_batch_items(req):
+    """Read batch items from a JSON array (or {"items": [...]}) or an NDJSON body"""
+    body = req.get_data(as_text=True)
+    if req.mimetype == 'application/json':
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise ValueError('Invalid JSON body')
+        if isinstance(items, dict):
+            items = items.get('items')
+        if not isinstance(items, list):
+            raise ValueError('Expected a JSON array of items')
+        return items
+    
+    items = []
+    for line_number, line in enumerate(body.splitlines(), 1):
+        if line.strip():
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f'Invalid JSON on line {line_number}')
+    return items
+
+def _batch_item_url(item):
+    """URL of a batch item that is analyzed as a URL, else None"""
+    if isinstance(item, dict) and not isinstance(item.get('text'), str) and isinstance(item.get('url'), str):
+        return item['url']
+    return None
+
+def _when_fetched(fetch, item):
+    """Future for a URL batch item, queued on the batch pool once its page analysis is done"""
+    future = Future()
+    
+    def run(fetch):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(_analyze_batch_item(item, fetch.result()))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    fetch.add_done_callback(lambda fetch: batch_pool.submit(run, fetch))
+    return future
+
+def _analyze_batch_item(item, url_analysis=None):
+    """
+    Analyze one batch item (a text string or a {"text"|"url", "id"} object)
+    
+    url_analysis is the URL analyzer's result for a URL item, when already fetched
+    """
+    if isinstance(item, str):
+        item = {'text': item}
+    if not isinstance(item, dict):
+        return {'status': 'error', 'error': 'Item must be a string or an object'}
+    
+    line = {'id': item['id']} if 'id' in item else {}
+    try:
+        if isinstance(item.get('text'), str):
+            if len(item['text'].strip()) == 0:
+                return dict(line, type='text', status='error', error='Empty text provided')
+            try:
+                deadline_ms = _parse_deadline_ms(item.get('deadline_ms'))
+                cascade_band = _parse_cascade_band(item.get('cascade', CASCADE_DEFAULT), item.get('cascade_band'))
+            except ValueError as e:
+                return dict(line, type='text', status='error', error=str(e))
+            result, cache_status = _analyze_text_cached(item['text'], deadline_ms, cascade_band)
+            return dict(line, type='text', status='ok', cache=cache_status, result=result)
+        
+        if isinstance(item.get('url'), str):
+            result = url_flight.do(item['url'], lambda: _run_url_analysis(item['url'], url_analysis))
+            if result.get('error'):
+                return dict(line, type='url', status='error', error=result['error'])
+            return dict(line, type='url', status='ok', result=result)
+        
+        return dict(line, status='error', error='Item needs a "text" or "url" string')
+        
+    except Exception as e:
+        logger.error(f"Error analyzing batch item: {str(e)}")
+        return dict(line, status='error', error='Internal server error', details=str(e))
+
+def _run_url_analysis(url, url_analysis=None):
+    """Analyze a URL and its extracted content; returns {'error': ...} on failure"""
+    logger.info(f"Analyzing URL: {url}")
+    
+    # Analyze URL and extract content, unless the caller already did
+    if url_analysis is None:
+        url_analysis = url_analyzer.analyze(url)
+    
+    if url_analysis.get('error'):
+        return {'error': url_analysis['error']}
+    
+    # Get AI analysis of the full extracted text, so long articles are
+    # analyzed as ranked sections; only the excerpt goes in the response
+    main_text = url_analysis.pop('main_text', url_analysis.get('content', ''))
+    ai_analysis = gemini_analyzer.analyze_text(main_text)
+    
+    # Combine results
+    return {
+        'type': 'url',
+        'url': url,
+        'title': url_analysis.get('title', 'Unknown'),
+        'risk_score': max(url_analysis['risk_score'], ai_analysis.get('risk_score', 0)),
+        'analysis': {
+            'url': url_analysis,
+            'ai': ai_analysis
+        },
+        'red_flags': url_analysis['red_flags'] + ai_analysis.get('red_flags', []),
+        'educational_tips': educational_content.get_tips_for_urls(),
+        'verification_suggestions': educational_content.get_verification_suggestions()
+    }
+
 @app.route('/api/analyze/image', methods=['POST'])
 def analyze_image():
     """Analyze image for potential misinformation"""
@@ -276,11 +758,18 @@ def analyze_image():
         
         logger.info(f"Analyzing image: {filename}")
         
-        # Analyze image
-        image_analysis = image_analyzer.analyze(filepath)
-        
-        # Get AI analysis
-        ai_analysis = gemini_analyzer.analyze_image(filepath)
+        # Open the upload once; pixels are decoded lazily, at most once, and
+        # shared by the technical and AI analysis
+        image = _open_image(filepath)
+        try:
+            # Analyze image
+            image_analysis = image_analyzer.analyze(filepath, image)
+            
+            # Get AI analysis
+            ai_analysis = gemini_analyzer.analyze_image(filepath, image)
+        finally:
+            if image is not None:
+                image.close()
         
         # Clean up uploaded file
         try:
@@ -310,6 +799,15 @@ def analyze_image():
         logger.error(f"Error analyzing image: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _open_image(filepath):
+    """Lazily opened PIL image, or None when the file isn't a readable image"""
+    try:
+        return Image.open(filepath)
+    except Exception as e:
+        # Each analyzer reports the unreadable file in its own result
+        logger.warning(f"Could not open image {filepath}: {str(e)}")
+        return None
+
 @app.route('/api/educational/tips')
 def get_educational_tips():
     """Get general educational tips about misinformation"""
@@ -2,7 +2,7 @@ import os
 import json
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import requests
 from datetime import datetime
 import hashlib
@@ -10,6 +10,9 @@ import numpy as np
 from collections import Counter
 import re
 
+from .document import AnalyzedDocument
+from .keyword_engine import get_keyword_engine
+
 logger = logging.getLogger(__name__)
 
 class AdvancedAIAnalyzer:
@@ -65,8 +68,39 @@ class AdvancedAIAnalyzer:
                 'naturalnews.com', 'beforeitsnews.com'
             ]
         }
+        
+        # Semantic consistency indicators
+        self.claim_words = ['prove', 'shows', 'demonstrates', 'confirms', 'reveals']
+        self.evidence_words = ['study', 'research', 'data', 'source', 'citation']
+        self.fallacies = {
+            'false_dichotomy': ['either', 'only two', 'must choose'],
+            'ad_hominem': ['stupid', 'idiotic', 'corrupt'],
+            'appeal_to_fear': ['dangerous', 'terrifying', 'catastrophic'],
+            'bandwagon': ['everyone knows', 'everybody says', 'most people']
+        }
+        
+        # Temporal indicators
+        self.urgency_indicators = [
+            'breaking', 'urgent', 'immediate', 'now', 'today', 'this hour',
+            'just in', 'developing', 'alert', 'warning'
+        ]
+        self.time_references = [
+            'yesterday', 'last week', 'recently', 'just happened',
+            'moments ago', 'hours ago', 'days ago'
+        ]
+        
+        # Register keyword lists with the shared single-pass engine
+        self.keyword_engine = get_keyword_engine()
+        for category, patterns in self.misinformation_patterns.items():
+            self.keyword_engine.register(f'advanced.{category}', patterns)
+        for fallacy, indicators in self.fallacies.items():
+            self.keyword_engine.register(f'advanced.fallacy.{fallacy}', indicators)
+        self.keyword_engine.register('advanced.claim_words', self.claim_words)
+        self.keyword_engine.register('advanced.evidence_words', self.evidence_words)
+        self.keyword_engine.register('advanced.urgency', self.urgency_indicators)
+        self.keyword_engine.register('advanced.time_references', self.time_references)
     
-    def analyze_comprehensive(self, content: str, content_type: str = 'text', 
+    def analyze_comprehensive(self, content: Union[str, AnalyzedDocument], content_type: str = 'text', 
                             url: Optional[str] = None) -> Dict:
         """
         Comprehensive multi-layered analysis of content
@@ -74,6 +108,9 @@ class AdvancedAIAnalyzer:
         start_time = time.time()
         
         try:
+            doc = AnalyzedDocument.of(content)
+            content = doc.text
+            
             analysis_results = {
                 'content_hash': hashlib.md5(content.encode()).hexdigest()[:16],
                 'analysis_timestamp': datetime.now().isoformat(),
@@ -86,11 +123,11 @@ class AdvancedAIAnalyzer:
             }
             
             # Layer 1: Semantic Consistency Analysis
-            semantic_analysis = self._analyze_semantic_consistency(content)
+            semantic_analysis = self._analyze_semantic_consistency(doc)
             analysis_results['detailed_analysis']['semantic'] = semantic_analysis
             
             # Layer 2: Factual Verification
-            factual_analysis = self._verify_factual_claims(content, url)
+            factual_analysis = self._verify_factual_claims(doc, url)
             analysis_results['detailed_analysis']['factual'] = factual_analysis
             
             # Layer 3: Source Credibility Assessment
@@ -102,11 +139,11 @@ class AdvancedAIAnalyzer:
                 analysis_results['detailed_analysis']['source'] = source_analysis
             
             # Layer 4: Linguistic Pattern Analysis
-            linguistic_analysis = self._analyze_linguistic_patterns(content)
+            linguistic_analysis = self._analyze_linguistic_patterns(doc)
             analysis_results['detailed_analysis']['linguistic'] = linguistic_analysis
             
             # Layer 5: Temporal Analysis
-            temporal_analysis = self._analyze_temporal_patterns(content)
+            temporal_analysis = self._analyze_temporal_patterns(doc)
             analysis_results['detailed_analysis']['temporal'] = temporal_analysis
             
             # Composite Risk Assessment
@@ -136,10 +173,10 @@ class AdvancedAIAnalyzer:
                 'processing_time': round(time.time() - start_time, 3)
             }
     
-    def _analyze_semantic_consistency(self, content: str) -> Dict:
+    def _analyze_semantic_consistency(self, doc: AnalyzedDocument) -> Dict:
         """Analyze semantic consistency and logical flow"""
         try:
-            sentences = content.split('.')
+            keyword_hits = doc.keyword_hits
             
             # Analyze logical flow
             logical_inconsistencies = 0
@@ -149,8 +186,8 @@ class AdvancedAIAnalyzer:
             positive_claims = []
             negative_claims = []
             
-            for sentence in sentences:
-                sentence = sentence.strip().lower()
+            for sentence in doc.lower_sentences:
+                sentence = sentence.strip()
                 if 'not' in sentence or 'never' in sentence or 'false' in sentence:
                     negative_claims.append(sentence)
                 else:
@@ -160,31 +197,19 @@ class AdvancedAIAnalyzer:
             semantic_score = 100
             
             # Penalty for excessive claims without evidence
-            claim_words = ['prove', 'shows', 'demonstrates', 'confirms', 'reveals']
-            evidence_words = ['study', 'research', 'data', 'source', 'citation']
-            
-            claims_count = sum(1 for word in claim_words if word in content.lower())
-            evidence_count = sum(1 for word in evidence_words if word in content.lower())
+            claims_count = keyword_hits.count('advanced.claim_words')
+            evidence_count = keyword_hits.count('advanced.evidence_words')
             
             if claims_count > evidence_count * 2:
                 semantic_score -= 30
                 contradictory_statements.append("Many claims made without sufficient evidence")
             
             # Check for logical fallacies
-            fallacies = {
-                'false_dichotomy': ['either', 'only two', 'must choose'],
-                'ad_hominem': ['stupid', 'idiotic', 'corrupt'],
-                'appeal_to_fear': ['dangerous', 'terrifying', 'catastrophic'],
-                'bandwagon': ['everyone knows', 'everybody says', 'most people']
-            }
-            
             detected_fallacies = []
-            for fallacy, indicators in fallacies.items():
-                for indicator in indicators:
-                    if indicator in content.lower():
-                        detected_fallacies.append(fallacy)
-                        semantic_score -= 15
-                        break
+            for fallacy in self.fallacies:
+                if keyword_hits.found(f'advanced.fallacy.{fallacy}'):
+                    detected_fallacies.append(fallacy)
+                    semantic_score -= 15
             
             return {
                 'semantic_score': max(0, semantic_score),
@@ -198,11 +223,11 @@ class AdvancedAIAnalyzer:
             logger.error(f"Error in semantic analysis: {str(e)}")
             return {'semantic_score': 50, 'error': str(e)}
     
-    def _verify_factual_claims(self, content: str, url: Optional[str] = None) -> Dict:
+    def _verify_factual_claims(self, doc: AnalyzedDocument, url: Optional[str] = None) -> Dict:
         """Verify factual claims using multiple sources"""
         try:
             # Extract potential factual claims
-            claims = self._extract_factual_claims(content)
+            claims = self._extract_factual_claims(doc)
             
             verification_results = {
                 'total_claims': len(claims),
@@ -241,10 +266,9 @@ class AdvancedAIAnalyzer:
             logger.error(f"Error in factual verification: {str(e)}")
             return {'verification_score': 50, 'error': str(e)}
     
-    def _extract_factual_claims(self, content: str) -> List[str]:
+    def _extract_factual_claims(self, doc: AnalyzedDocument) -> List[str]:
         """Extract potential factual claims from content"""
         # Simple factual claim extraction
-        sentences = content.split('.')
         claims = []
         
         factual_indicators = [
@@ -252,10 +276,9 @@ class AdvancedAIAnalyzer:
             'according to', 'scientists found', 'experts say', 'reports indicate'
         ]
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if any(indicator in sentence.lower() for indicator in factual_indicators):
-                claims.append(sentence)
+        for sentence, sentence_lower in zip(doc.sentences, doc.lower_sentences):
+            if any(indicator in sentence_lower for indicator in factual_indicators):
+                claims.append(sentence.strip())
         
         return claims[:5]  # Return max 5 claims
     
@@ -338,7 +361,7 @@ class AdvancedAIAnalyzer:
         else:
             return 5.0  # Default estimate
     
-    def _analyze_linguistic_patterns(self, content: str) -> Dict:
+    def _analyze_linguistic_patterns(self, doc: AnalyzedDocument) -> Dict:
         """Analyze linguistic patterns for misinformation indicators"""
         try:
             analysis = {
@@ -347,14 +370,9 @@ class AdvancedAIAnalyzer:
                 'linguistic_score': 100
             }
             
-            content_lower = content.lower()
-            
             # Analyze each pattern category
-            for category, patterns in self.misinformation_patterns.items():
-                detected = []
-                for pattern in patterns:
-                    if pattern in content_lower:
-                        detected.append(pattern)
+            for category in self.misinformation_patterns:
+                detected = doc.keyword_hits.found(f'advanced.{category}')
                 
                 if detected:
                     analysis['detected_patterns'].extend(detected)
@@ -365,15 +383,14 @@ class AdvancedAIAnalyzer:
                     analysis['pattern_scores'][category] = 100
             
             # Additional linguistic analysis
-            sentences = content.split('.')
-            avg_sentence_length = np.mean([len(s.split()) for s in sentences if s.strip()])
+            avg_sentence_length = np.mean(doc.sentence_word_counts)
             
             # Very short or very long sentences can indicate poor quality
             if avg_sentence_length < 5 or avg_sentence_length > 40:
                 analysis['linguistic_score'] -= 15
             
             # Check for excessive punctuation
-            exclamation_ratio = content.count('!') / max(len(content.split()), 1)
+            exclamation_ratio = doc.char_counts['exclamation'] / max(doc.word_count, 1)
             if exclamation_ratio > 0.1:
                 analysis['linguistic_score'] -= 20
             
@@ -385,23 +402,11 @@ class AdvancedAIAnalyzer:
             logger.error(f"Error in linguistic analysis: {str(e)}")
             return {'linguistic_score': 50, 'error': str(e)}
     
-    def _analyze_temporal_patterns(self, content: str) -> Dict:
+    def _analyze_temporal_patterns(self, doc: AnalyzedDocument) -> Dict:
         """Analyze temporal patterns and urgency indicators"""
         try:
-            urgency_indicators = [
-                'breaking', 'urgent', 'immediate', 'now', 'today', 'this hour',
-                'just in', 'developing', 'alert', 'warning'
-            ]
-            
-            time_references = [
-                'yesterday', 'last week', 'recently', 'just happened',
-                'moments ago', 'hours ago', 'days ago'
-            ]
-            
-            content_lower = content.lower()
-            
-            urgency_count = sum(1 for indicator in urgency_indicators if indicator in content_lower)
-            time_ref_count = sum(1 for ref in time_references if ref in content_lower)
+            urgency_count = doc.keyword_hits.count('advanced.urgency')
+            time_ref_count = doc.keyword_hits.count('advanced.time_references')
             
             # Calculate temporal manipulation score
             temporal_score = 100
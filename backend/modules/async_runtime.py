@@ -0,0 +1,114 @@
+"""
+Background asyncio runtime
+A long-lived event loop on a daemon thread (one per worker process) that
+synchronous Flask handlers submit coroutines to
+"""
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundEventLoop:
+    """Event loop running forever on its own thread with a thread-safe submit API"""
+
+    def __init__(self, name: str = 'analysis-event-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use and restarted after a fork"""
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    def _start(self) -> None:
+        """Create the loop and its thread"""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        self._pid = os.getpid()
+        logger.info(f"Background event loop started in process {self._pid}")
+
+    def is_current(self) -> bool:
+        """True when called from a coroutine running on this loop"""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine from any thread and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block the calling thread for its result"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine function to run on the loop before it stops"""
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Run shutdown hooks, then stop the loop and join its thread"""
+        if self._loop is None or self._pid != os.getpid() or not self._loop.is_running():
+            return
+
+        async def run_hooks():
+            for hook in self._shutdown_hooks:
+                try:
+                    await hook()
+                except Exception as e:
+                    logger.warning(f"Event loop shutdown hook failed: {str(e)}")
+
+        try:
+            asyncio.run_coroutine_threadsafe(run_hooks(), self._loop).result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Error running event loop shutdown hooks: {str(e)}")
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+        if not self._loop.is_running():
+            self._loop.close()
+        self._loop = None
+
+
+_background_loop: Optional[BackgroundEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Process-wide background event loop"""
+    global _background_loop
+    if _background_loop is None:
+        with _background_lock:
+            if _background_loop is None:
+                _background_loop = BackgroundEventLoop()
+                atexit.register(_background_loop.shutdown)
+    return _background_loop
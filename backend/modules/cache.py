@@ -0,0 +1,163 @@
+"""
+In-memory result cache
+Thread-safe LRU cache with per-entry expiry, entry and memory caps and
+hit/miss/eviction counters, optionally backed by the shared disk tier
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-like value in bytes"""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class TTLCache:
+    """LRU cache whose entries also expire after a time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, name: str = 'cache',
+                 sizeof: Callable[[Any], int] = estimate_size, disk=None,
+                 namespace: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Default time-to-live in seconds (None never expires)
+            max_bytes: Optional cap on the estimated size of all values
+            name: Name used in logs and stats
+            sizeof: Function estimating the size of a value in bytes
+            disk: Optional DiskCache consulted on memory misses and written through on set
+            namespace: Disk cache namespace (defaults to name)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.name = name
+        self._sizeof = sizeof
+        self.disk = disk
+        self.namespace = namespace or name
+        # key -> (value, expires_at, size)
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry and mark it recently used, or default"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+        if self.disk is not None:
+            stored = self.disk.get_with_expiry(self.namespace, self._disk_key(key))
+            if stored is not None:
+                value, remaining = stored
+                self._set_memory(key, value, remaining)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting least recently used ones if needed"""
+        ttl = self.ttl if ttl is None else ttl
+        self._set_memory(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(self.namespace, self._disk_key(key), value, ttl)
+
+    def _set_memory(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        """Insert into the in-memory tier only"""
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"{self.name}: value of {size} bytes exceeds cache budget, not cached")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.disk is not None:
+            self.disk.delete(self.namespace, self._disk_key(key))
+
+    def clear(self) -> None:
+        """Remove every in-memory entry (counters and the disk tier are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        """Stable string key for the disk tier"""
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry; caller holds the lock"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Current size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes if self.max_bytes is not None else None,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'disk_hits': self.disk_hits if self.disk is not None else None
+            }
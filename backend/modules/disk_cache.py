@@ -0,0 +1,181 @@
+"""
+Persistent cache tier
+SQLite-backed key-value store under a configurable directory, shared by
+every worker process on the host and kept across deploys and restarts
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """Process-safe JSON value store with per-entry expiry, backed by SQLite in WAL mode"""
+
+    def __init__(self, directory: str, filename: str = 'analysis_cache.sqlite3',
+                 max_entries: int = 200000, busy_timeout: float = 5.0):
+        """
+        Args:
+            directory: Directory holding the database file (created if missing)
+            filename: Database file name
+            max_entries: Total entries kept across all namespaces
+            busy_timeout: Seconds to wait for another process holding the write lock
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.max_entries = max_entries
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self.errors = 0
+
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' namespace TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' expires_at REAL,'
+            ' created_at REAL NOT NULL,'
+            ' PRIMARY KEY (namespace, key)'
+            ') WITHOUT ROWID'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread, per-process connection (SQLite handles must not cross a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a live value, or None on a miss or any storage error"""
+        entry = self.get_with_expiry(namespace, key)
+        return entry[0] if entry is not None else None
+
+    def get_with_expiry(self, namespace: str, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, remaining seconds or None) for a live entry"""
+        try:
+            row = self._connection().execute(
+                'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?',
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            remaining = None if expires_at is None else expires_at - time.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            return json.loads(value), remaining
+        except (sqlite3.Error, ValueError) as e:
+            self._log_error('read', e)
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Insert or replace a value; storage errors are logged and ignored"""
+        now = time.time()
+        try:
+            payload = json.dumps(value, default=str)
+            self._connection().execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, payload, now + ttl if ttl is not None else None, now)
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._log_error('write', e)
+            return
+
+        with self._writes_lock:
+            self._writes += 1
+            prune = self._writes % 500 == 0
+        if prune:
+            self.prune()
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a value if present"""
+        try:
+            self._connection().execute(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key)
+            )
+        except sqlite3.Error as e:
+            self._log_error('delete', e)
+
+    def prune(self) -> None:
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        try:
+            conn = self._connection()
+            conn.execute('DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                         (time.time(),))
+            (count,) = conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    'DELETE FROM cache WHERE (namespace, key) IN '
+                    '(SELECT namespace, key FROM cache ORDER BY created_at LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            self._log_error('prune', e)
+
+    def stats(self) -> Dict:
+        """Entry counts per namespace"""
+        try:
+            rows = self._connection().execute(
+                'SELECT namespace, COUNT(*) FROM cache GROUP BY namespace'
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._log_error('stats', e)
+            rows = []
+        return {
+            'path': self.path,
+            'max_entries': self.max_entries,
+            'namespaces': dict(rows),
+            'errors': self.errors
+        }
+
+    def _log_error(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Disk cache {operation} failed: {str(error)}")
+
+
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_initialized = False
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """
+    Process-wide disk cache, configured from the environment
+
+    Returns None when DISK_CACHE_ENABLED is false or the store cannot be opened,
+    in which case callers simply run with their in-memory tier only
+    """
+    global _disk_cache, _disk_cache_initialized
+    if not _disk_cache_initialized:
+        with _disk_cache_lock:
+            if not _disk_cache_initialized:
+                if os.getenv('DISK_CACHE_ENABLED', 'true').lower() == 'true':
+                    directory = os.getenv(
+                        'CACHE_DIR',
+                        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache')
+                    )
+                    try:
+                        _disk_cache = DiskCache(
+                            directory,
+                            max_entries=int(os.getenv('DISK_CACHE_MAX_ENTRIES', 200000))
+                        )
+                        logger.info(f"Disk cache enabled at {_disk_cache.path}")
+                    except (OSError, sqlite3.Error) as e:
+                        logger.warning(f"Disk cache unavailable: {str(e)}")
+                _disk_cache_initialized = True
+    return _disk_cache
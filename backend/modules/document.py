@@ -0,0 +1,96 @@
+"""
+Shared analysis document
+Wraps a piece of text once per request so every analyzer reuses the same
+lowercased copy, token list, sentence split and keyword scan
+"""
+import re
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Union
+
+from .keyword_engine import KeywordEngine, KeywordHits, get_keyword_engine
+
+
+class AnalyzedDocument:
+    """Lazily computed, memoized views of a text shared across the analysis pipeline"""
+
+    def __init__(self, text: str, keyword_engine: Optional[KeywordEngine] = None):
+        self.text = text
+        self._keyword_engine = keyword_engine
+
+    @classmethod
+    def of(cls, content: Union[str, 'AnalyzedDocument']) -> 'AnalyzedDocument':
+        """Return content unchanged if it is already a document, else wrap it"""
+        if isinstance(content, cls):
+            return content
+        return cls(content)
+
+    @cached_property
+    def lower(self) -> str:
+        """Lowercased text"""
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Whitespace-separated tokens of the original text"""
+        return self.text.split()
+
+    @cached_property
+    def lower_tokens(self) -> List[str]:
+        """Whitespace-separated tokens of the lowercased text"""
+        return self.lower.split()
+
+    @property
+    def word_count(self) -> int:
+        """Number of whitespace-separated tokens"""
+        return len(self.tokens)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Raw sentences, split on periods"""
+        return self.text.split('.')
+
+    @cached_property
+    def lower_sentences(self) -> List[str]:
+        """Lowercased sentences, aligned with `sentences`"""
+        return self.lower.split('.')
+
+    @cached_property
+    def sentence_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) character offsets of each sentence in the text"""
+        spans = []
+        start = 0
+        for sentence in self.sentences:
+            end = start + len(sentence)
+            spans.append((start, end))
+            start = end + 1
+        return spans
+
+    @cached_property
+    def sentence_word_counts(self) -> List[int]:
+        """Token count of every non-blank sentence"""
+        return [len(sentence.split()) for sentence in self.sentences if sentence.strip()]
+
+    @cached_property
+    def normalized(self) -> str:
+        """Text stripped with every whitespace run collapsed to one space"""
+        return re.sub(r'\s+', ' ', self.text.strip())
+
+    @cached_property
+    def normalized_sentences(self) -> List[str]:
+        """Sentences of the whitespace-normalized text, split on periods"""
+        return self.normalized.split('.')
+
+    @cached_property
+    def char_counts(self) -> Dict[str, int]:
+        """Character-class counts used by the structural checks"""
+        return {
+            'upper': sum(map(str.isupper, self.text)),
+            'exclamation': self.text.count('!'),
+            'question': self.text.count('?')
+        }
+
+    @cached_property
+    def keyword_hits(self) -> KeywordHits:
+        """Single keyword engine pass over the lowercased text"""
+        engine = self._keyword_engine or get_keyword_engine()
+        return engine.scan(self.lower)
@@ -0,0 +1,190 @@
+"""
+Rate-limited Gemini client
+Wraps a GenerativeModel so every call from every request thread goes through
+one concurrency limit and one token bucket on the background event loop, with
+jittered exponential backoff on rate-limit and server errors
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+from google.api_core import exceptions as google_exceptions
+
+from .async_runtime import get_background_loop
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_RATE_LIMIT_ERRORS = (google_exceptions.TooManyRequests,)
+_SERVER_ERRORS = (
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call cannot start or be retried before its deadline"""
+
+
+class TokenBucket:
+    """Asyncio token bucket; waiters are served in arrival order"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, deadline: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting for it if needed
+
+        Args:
+            deadline: time.monotonic() value after which waiting is pointless
+
+        Returns:
+            False (without taking a token) when one won't be available before the deadline
+        """
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+            return True
+
+    def drain(self) -> None:
+        """Empty the bucket so every caller pauses after the server pushes back"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class AsyncGeminiClient:
+    """Concurrency-limited, rate-limited, retrying front end for a GenerativeModel"""
+
+    def __init__(self, model, max_concurrency: int = 4, requests_per_minute: float = 15,
+                 burst: float = 3, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0):
+        """
+        Args:
+            model: google.generativeai GenerativeModel (or anything with generate_content)
+            max_concurrency: Calls allowed in flight at once across all request threads
+            requests_per_minute: Sustained request rate matching the API quota
+            burst: Requests allowed back to back before the rate applies
+            max_retries: Retries after a rate-limit or server error
+            backoff_base: First backoff ceiling in seconds (doubles per attempt)
+            backoff_max: Largest backoff ceiling in seconds
+        """
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.event_loop = get_background_loop()
+        self._waiting = 0
+        self._in_flight = 0
+        self._counts_lock = threading.Lock()
+        # asyncio primitives belong to one loop; rebuilt if the loop restarts after a fork
+        self._primitives_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
+
+    def generate_content(self, *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        """
+        Blocking entry point for request threads; same arguments as
+        GenerativeModel.generate_content plus an optional deadline
+
+        Args:
+            deadline: time.monotonic() value after which no new attempt is started
+
+        Returns:
+            The model response
+        """
+        return self.event_loop.run(self.generate_content_async(*args, deadline=deadline, **kwargs))
+
+    async def generate_content_async(self, *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        """Rate-limited, retrying generate_content; must run on the background loop"""
+        semaphore, bucket = self._primitives()
+        attempt = 0
+        while True:
+            self._count('_waiting', 1)
+            try:
+                if not await bucket.acquire(deadline):
+                    metrics.increment('gemini_client.deadline_exceeded')
+                    raise DeadlineExceeded('No request quota available before the deadline')
+                await semaphore.acquire()
+            finally:
+                self._count('_waiting', -1)
+
+            self._count('_in_flight', 1)
+            try:
+                metrics.increment('gemini_client.requests')
+                # The SDK call blocks, so it runs on the loop's worker threads
+                return await asyncio.to_thread(self.model.generate_content, *args, **kwargs)
+            except _RATE_LIMIT_ERRORS + _SERVER_ERRORS as e:
+                if isinstance(e, _RATE_LIMIT_ERRORS):
+                    metrics.increment('gemini_client.rate_limited')
+                    bucket.drain()
+                else:
+                    metrics.increment('gemini_client.server_errors')
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+            finally:
+                self._count('_in_flight', -1)
+                semaphore.release()
+
+            # Full jitter keeps callers that failed together from retrying together
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                metrics.increment('gemini_client.deadline_exceeded')
+                raise error
+            attempt += 1
+            metrics.increment('gemini_client.retries')
+            logger.info(f"Gemini call failed ({type(error).__name__}), retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _primitives(self):
+        """Semaphore and token bucket bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._primitives_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bucket = TokenBucket(self.requests_per_minute / 60, self.burst)
+            self._primitives_loop = loop
+        return self._semaphore, self._bucket
+
+    def _count(self, attribute: str, amount: int) -> None:
+        with self._counts_lock:
+            setattr(self, attribute, getattr(self, attribute) + amount)
+
+    def stats(self) -> Dict:
+        """Current queue depth and limits (retry counts live in the metrics registry)"""
+        with self._counts_lock:
+            return {
+                'waiting': self._waiting,
+                'in_flight': self._in_flight,
+                'max_concurrency': self.max_concurrency,
+                'requests_per_minute': self.requests_per_minute,
+                'burst': self.burst
+            }
@@ -1,24 +1,93 @@
 import google.generativeai as genai
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 import logging
 import json
+import re
 import base64
+import copy
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
+from .cache import TTLCache
+from .disk_cache import get_disk_cache
+from .gemini_client import AsyncGeminiClient
+from .image_preprocessing import ImagePreprocessor
+from .document import AnalyzedDocument
+from .local_classifier import LocalClassifier
+from .long_document import ChunkRanker, reduce_chunk_analyses, split_into_chunks
+from .metrics import metrics
+from .micro_batcher import MicroBatcher
+from .realtime_fact_checker import CLAIM_PATTERNS
+from .response_schema import ANALYSIS_SCHEMA, BATCH_ANALYSIS_SCHEMA, validate_analysis
+
 logger = logging.getLogger(__name__)
 
+# Bump when a prompt template or the way its response is parsed changes, so
+# results cached for the old prompt are not served for the new one
+TEXT_PROMPT_VERSION = 1
+IMAGE_PROMPT_VERSION = 1
+
+# Safety settings to avoid blocking
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_NONE"
+    }
+]
+
+# '### 3' style headers separating the answers to a multi-item prompt
+_BATCH_SECTION_RE = re.compile(r'^[ \t]*#{1,6}[ \t]*\[?(\d+)\]?[ \t]*$', re.MULTILINE)
+
 class GeminiAnalyzer:
     """Integrates with Google's Gemini AI for advanced content analysis"""
     
     def __init__(self):
         self.api_key = os.getenv('GOOGLE_API_KEY')
+        self.client = None
+        self.model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')  # Faster, free tier friendly
+        self.text_generation_config = {
+            'temperature': 0.3,
+            'max_output_tokens': 500,
+        }
+        self.image_generation_config = None
+        
+        # Structured output: Gemini answers in JSON matching a schema, parsed
+        # with one json.loads and strictly validated instead of scraped
+        self.structured_output = os.getenv('GEMINI_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+        if self.structured_output:
+            structured = {'response_mime_type': 'application/json', 'response_schema': ANALYSIS_SCHEMA}
+            self.text_generation_config.update(structured)
+            self.image_generation_config = structured
         
         if self.api_key:
             try:
                 genai.configure(api_key=self.api_key)
-                # Use the correct model names for Gemini
-                self.model = genai.GenerativeModel('gemini-1.5-flash')  # Faster, free tier friendly
+                self.model = genai.GenerativeModel(self.model_name)
+                # Every call shares one concurrency limit, quota bucket and retry policy
+                self.client = AsyncGeminiClient(
+                    self.model,
+                    max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', 4)),
+                    requests_per_minute=float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 15)),
+                    burst=float(os.getenv('GEMINI_BURST', 3)),
+                    max_retries=int(os.getenv('GEMINI_MAX_RETRIES', 3)),
+                    backoff_base=float(os.getenv('GEMINI_BACKOFF_BASE_MS', 500)) / 1000,
+                    backoff_max=float(os.getenv('GEMINI_BACKOFF_MAX_MS', 8000)) / 1000
+                )
                 self.available = True
                 logger.info("Gemini AI integration initialized successfully")
             except Exception as e:
@@ -27,73 +96,285 @@ class GeminiAnalyzer:
         else:
             self.available = False
             logger.warning("Gemini API key not found. AI analysis will be limited.")
+        
+        # Parsed AI results keyed by model, prompt version, generation config
+        # and content hash; optionally persisted on disk so restarts and
+        # sibling workers don't repeat paid calls
+        use_disk = os.getenv('GEMINI_CACHE_DISK', 'true').lower() == 'true'
+        self.cache = TTLCache(
+            max_entries=int(os.getenv('GEMINI_CACHE_SIZE', 2000)),
+            ttl=float(os.getenv('GEMINI_CACHE_TTL', 24 * 3600)),
+            name='gemini_results',
+            disk=get_disk_cache() if use_disk else None,
+            namespace='gemini'
+        )
+        
+        # Images are downscaled, re-encoded and stripped of EXIF before upload
+        self.image_preprocessor = None
+        if os.getenv('GEMINI_IMAGE_PREPROCESS', 'true').lower() == 'true':
+            self.image_preprocessor = ImagePreprocessor(
+                max_edge=int(os.getenv('GEMINI_IMAGE_MAX_EDGE', 1536)),
+                quality=int(os.getenv('GEMINI_IMAGE_QUALITY', 85)),
+                image_format=os.getenv('GEMINI_IMAGE_FORMAT', 'JPEG'),
+                target_bytes=int(os.getenv('GEMINI_IMAGE_TARGET_BYTES', 1024 * 1024))
+            )
+        
+        # Micro-batching: texts arriving within the window share one
+        # numbered multi-item prompt, trading a little latency for fewer
+        # requests against the per-minute quota (0 disables it)
+        self.batcher = None
+        batch_window_ms = float(os.getenv('GEMINI_BATCH_WINDOW_MS', 0))
+        if batch_window_ms > 0:
+            self.batcher = MicroBatcher(
+                self._analyze_text_batch,
+                window=batch_window_ms / 1000,
+                max_items=int(os.getenv('GEMINI_BATCH_MAX_ITEMS', 8)),
+                name='gemini_batch'
+            )
+        
+        # Long documents: split into sentence-aligned sections of at most
+        # max_text_chars, rank them by claim density and keyword hits, and
+        # analyze the top few concurrently (0 falls back to truncation)
+        self.max_text_chars = int(os.getenv('GEMINI_CHUNK_CHARS', 1000))
+        self.long_document_chunks = int(os.getenv('GEMINI_LONG_DOC_CHUNKS', 3))
+        self.chunk_ranker = ChunkRanker(CLAIM_PATTERNS)
+        # Gemini concurrency itself is bounded by the client's semaphore
+        self.chunk_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='gemini-chunk')
+        
+        # Optional offline classifier: 'fallback' answers when Gemini can't,
+        # 'gate' also skips Gemini when the local model is confident, and
+        # 'replace' never calls Gemini for text
+        self.local_model = None
+        self.local_model_mode = os.getenv('LOCAL_MODEL_MODE', 'fallback').lower()
+        self.local_gate_band = (float(os.getenv('LOCAL_MODEL_GATE_LOW', 0.2)),
+                                float(os.getenv('LOCAL_MODEL_GATE_HIGH', 0.8)))
+        model_path = os.getenv(
+            'LOCAL_MODEL_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models', 'local_classifier.npz')
+        )
+        if os.path.exists(model_path):
+            try:
+                self.local_model = LocalClassifier.load(model_path)
+                logger.info(f"Local classifier loaded from {model_path} ({self.local_model_mode} mode)")
+            except Exception as e:
+                logger.error(f"Error loading local classifier: {str(e)}")
     
-    def analyze_text(self, text: str) -> Dict:
+    def analyze_text(self, text: Union[str, AnalyzedDocument], timeout: Optional[float] = None) -> Dict:
         """
         Analyze text content using Gemini AI
         
         Args:
-            text: The text content to analyze
+            text: The text content to analyze, or a shared AnalyzedDocument
+            timeout: Optional budget in seconds; no Gemini attempt or retry is
+                started that could not finish within it
             
         Returns:
             Dictionary containing AI analysis results
         """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        text = AnalyzedDocument.of(text).text
+        
+        if self.local_model is not None and self.local_model_mode in ('gate', 'replace'):
+            local_analysis = self.local_model.analyze(text)
+            probability = local_analysis['misinformation_probability']
+            low, high = self.local_gate_band
+            if self.local_model_mode == 'replace' or not low < probability < high:
+                metrics.increment('local_model.answered')
+                return local_analysis
+            metrics.increment('local_model.escalated')
+        
         if not self.available:
-            return self._get_fallback_analysis()
+            return self._get_fallback_analysis(text)
         
         try:
-            # Limit text length to avoid quota issues
-            if len(text) > 1000:
-                text = text[:1000] + "..."
-            
-            prompt = self._create_simple_text_prompt(text)
+            if self.long_document_chunks > 0 and len(text) > self.max_text_chars:
+                return self._analyze_long_text(text, deadline)
             
-            # Add safety settings to avoid blocking
-            safety_settings = [
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE"
-                }
-            ]
-            
-            response = self.model.generate_content(
-                prompt,
-                safety_settings=safety_settings,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,
-                    max_output_tokens=500,
-                )
-            )
+            # Limit text length to avoid quota issues
+            if len(text) > self.max_text_chars:
+                text = text[:self.max_text_chars] + "..."
             
-            if response.text:
-                # Simple parsing instead of complex JSON
-                return self._parse_simple_response(response.text)
+            analysis = self._analyze_text_chunk(text, deadline)
+            if analysis is not None:
+                return analysis
             else:
-                logger.warning("Empty response from Gemini AI")
-                return self._get_fallback_analysis()
+                logger.warning("Empty or unusable response from Gemini AI")
+                return self._get_fallback_analysis(text, degraded=True)
                 
         except Exception as e:
             logger.error(f"Error in Gemini text analysis: {str(e)}")
-            return self._get_fallback_analysis()
+            return self._get_fallback_analysis(text, degraded=True)
     
-    def analyze_image(self, image_path: str) -> Dict:
+    def _analyze_text_chunk(self, text: str, deadline: Optional[float] = None) -> Optional[Dict]:
+        """Cached Gemini analysis of one prompt-sized text; None when the response is empty"""
+        cache_key = self._cache_key(
+            'text', TEXT_PROMPT_VERSION, self.text_generation_config,
+            hashlib.sha256(text.encode('utf-8')).hexdigest()
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        if self.batcher is not None:
+            analysis = self.batcher.submit(text, deadline).result(timeout=self._remaining(deadline))
+        else:
+            analysis = self._generate_text_analysis(text, deadline)
+        
+        if analysis is None:
+            return None
+        self.cache.set(cache_key, analysis)
+        return copy.deepcopy(analysis)
+    
+    def _analyze_long_text(self, text: str, deadline: Optional[float] = None) -> Dict:
+        """
+        Analyze the most suspicious sections of a long text concurrently and
+        reduce their verdicts, instead of judging only its first section
+        
+        Args:
+            text: Text longer than one prompt's worth of characters
+            deadline: time.monotonic() value by which an answer is needed
+            
+        Returns:
+            Reduced analysis, or the fallback when no section could be analyzed
+        """
+        chunks = split_into_chunks(text, self.max_text_chars)
+        picked = self.chunk_ranker.top_chunks(chunks, self.long_document_chunks)
+        metrics.increment('gemini_long_document.documents')
+        metrics.increment('gemini_long_document.chunks_sent', len(picked))
+        
+        futures = [self.chunk_pool.submit(self._analyze_text_chunk, chunk, deadline)
+                   for _, chunk, _ in picked]
+        analyses = []
+        for (index, _, _), future in zip(picked, futures):
+            try:
+                analysis = future.result(timeout=self._remaining(deadline))
+            except Exception as e:
+                # Sections still running keep going and land in the cache
+                logger.warning(f"Gemini section analysis failed: {str(e)}")
+                continue
+            if analysis is not None:
+                analyses.append((index, analysis))
+        
+        if not analyses:
+            return self._get_fallback_analysis(text, degraded=True)
+        reduced = reduce_chunk_analyses(analyses, len(chunks))
+        if len(analyses) < len(picked):
+            # Verdict from only some of the picked sections
+            reduced['degraded'] = True
+        return reduced
+    
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        """Seconds left before a deadline (None without one)"""
+        return max(0.0, deadline - time.monotonic()) if deadline is not None else None
+    
+    def _generate_text_analysis(self, text: str, deadline: Optional[float] = None) -> Optional[Dict]:
+        """One Gemini call for one text; None when the response is empty"""
+        prompt = self._create_simple_text_prompt(text)
+        
+        response = self.client.generate_content(
+            prompt,
+            safety_settings=SAFETY_SETTINGS,
+            generation_config=genai.types.GenerationConfig(**self.text_generation_config),
+            deadline=deadline
+        )
+        
+        if not response.text:
+            return None
+        return self._parse_response(response.text)
+    
+    def _analyze_text_batch(self, texts: List[str], deadlines: List[Optional[float]]) -> List[Optional[Dict]]:
+        """
+        Analyze several texts with one numbered multi-item prompt
+        
+        Args:
+            texts: Texts collected by the micro-batcher (each at most one prompt's worth)
+            deadlines: Each text's caller deadline (time.monotonic() value or None)
+            
+        Returns:
+            One parsed analysis (or None) per text, in order
+        """
+        # Callers whose deadline already passed have stopped waiting
+        now = time.monotonic()
+        live = [index for index, deadline in enumerate(deadlines) if deadline is None or deadline > now]
+        analyses: List[Optional[Dict]] = [None] * len(texts)
+        if not live:
+            return analyses
+        if len(live) == 1:
+            analyses[live[0]] = self._generate_text_analysis(texts[live[0]], deadlines[live[0]])
+            return analyses
+        
+        live_texts = [texts[index] for index in live]
+        for index, analysis in zip(live, self._generate_batch_analysis(live_texts, [deadlines[i] for i in live])):
+            analyses[index] = analysis
+        return analyses
+    
+    def _generate_batch_analysis(self, texts: List[str], deadlines: List[Optional[float]]) -> List[Optional[Dict]]:
+        """One Gemini call for several texts, bounded by the earliest deadline among them"""
+        set_deadlines = [deadline for deadline in deadlines if deadline is not None]
+        earliest = min(set_deadlines) if set_deadlines else None
+        
+        generation_config = dict(
+            self.text_generation_config,
+            max_output_tokens=self.text_generation_config['max_output_tokens'] * len(texts)
+        )
+        if self.structured_output:
+            generation_config['response_schema'] = BATCH_ANALYSIS_SCHEMA
+        response = self.client.generate_content(
+            self._create_batch_text_prompt(texts),
+            safety_settings=SAFETY_SETTINGS,
+            generation_config=genai.types.GenerationConfig(**generation_config),
+            deadline=earliest
+        )
+        
+        if self.structured_output:
+            parsed = self._parse_structured_batch(response.text or '', len(texts))
+        else:
+            parsed = [self._parse_simple_response(section) if section is not None else None
+                      for section in self._split_batch_response(response.text or '', len(texts))]
+        
+        analyses = []
+        for text, deadline, analysis in zip(texts, deadlines, parsed):
+            if analysis is None:
+                # Items the model skipped or mangled get a call of their own,
+                # within their own caller's deadline
+                metrics.increment('gemini_batch.item_retries')
+                try:
+                    analysis = self._generate_text_analysis(text, deadline)
+                except Exception as e:
+                    logger.warning(f"Gemini retry of a batch item failed: {str(e)}")
+            analyses.append(analysis)
+        return analyses
+    
+    def _split_batch_response(self, response_text: str, count: int) -> List[Optional[str]]:
+        """Cut a multi-item response into per-item sections by their '### n' headers"""
+        sections: List[Optional[str]] = [None] * count
+        headers = list(_BATCH_SECTION_RE.finditer(response_text))
+        for header, following in zip(headers, headers[1:] + [None]):
+            number = int(header.group(1))
+            end = following.start() if following is not None else len(response_text)
+            section = response_text[header.end():end].strip()
+            if 1 <= number <= count and section and sections[number - 1] is None:
+                sections[number - 1] = section
+        return sections
+    
+    def _parse_structured_batch(self, response_text: str, count: int) -> List[Optional[Dict]]:
+        """Validate a JSON array answer to a multi-item prompt and order it by item number"""
+        analyses: List[Optional[Dict]] = [None] * count
+        items = self._decode_structured(response_text, expect_list=True)
+        for item in items or []:
+            analysis = self._validate_structured(item, extra_fields=('item',))
+            if analysis is not None and 1 <= analysis['item'] <= count:
+                analyses[analysis.pop('item') - 1] = analysis
+        return analyses
+    
+    def analyze_image(self, image_path: str, image: Optional[Image.Image] = None) -> Dict:
         """
         Analyze image content using Gemini AI
         
         Args:
             image_path: Path to the image file
+            image: The same image already decoded by the caller, to avoid decoding it again
             
         Returns:
             Dictionary containing AI analysis results
@@ -102,34 +383,74 @@ class GeminiAnalyzer:
             return self._get_fallback_analysis()
         
         try:
+            cache_key = self._cache_key(
+                'image', IMAGE_PROMPT_VERSION, self.image_generation_config, self._hash_file(image_path),
+                self.image_preprocessor.settings() if self.image_preprocessor is not None else None
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            
             # Load and prepare image
-            image = Image.open(image_path)
+            image_content = self._prepare_image(image_path, image)
             
-            # Simple image analysis prompt
-            prompt = """
-Analyze this image for potential manipulation or misleading content. 
-Rate manipulation risk 0-100 and list any concerns.
-
-Look for: digital manipulation, inconsistent lighting/shadows, misleading context, deepfakes.
-
-Response format:
-Risk Score: [0-100]
-Issues: [list problems found]
-Explanation: [brief explanation]
-"""
+            prompt = self._create_image_prompt()
             
-            response = self.model.generate_content([prompt, image])
+            if self.image_generation_config is not None:
+                response = self.client.generate_content(
+                    [prompt, image_content],
+                    generation_config=genai.types.GenerationConfig(**self.image_generation_config)
+                )
+            else:
+                response = self.client.generate_content([prompt, image_content])
             
-            if response.text:
-                analysis = self._parse_simple_response(response.text)
-                return analysis
+            analysis = self._parse_response(response.text) if response.text else None
+            if analysis is not None:
+                self.cache.set(cache_key, analysis)
+                return copy.deepcopy(analysis)
             else:
-                logger.warning("Empty response from Gemini Vision")
-                return self._get_fallback_analysis()
+                logger.warning("Empty or unusable response from Gemini Vision")
+                return self._get_fallback_analysis(degraded=True)
                 
         except Exception as e:
             logger.error(f"Error in Gemini image analysis: {str(e)}")
-            return self._get_fallback_analysis()
+            return self._get_fallback_analysis(degraded=True)
+    
+    def _prepare_image(self, image_path: str, image: Optional[Image.Image] = None):
+        """Downscaled, re-encoded upload for the image, or the decoded image itself"""
+        if self.image_preprocessor is None:
+            return image if image is not None else Image.open(image_path)
+        
+        if image is not None:
+            blob, prepared = self.image_preprocessor.prepare(image)
+        else:
+            blob, prepared = self.image_preprocessor.prepare_file(image_path)
+        original_bytes = os.path.getsize(image_path)
+        metrics.increment('gemini_image.images')
+        metrics.increment('gemini_image.bytes_in', original_bytes)
+        metrics.increment('gemini_image.bytes_sent', prepared['bytes'])
+        logger.info(
+            f"Image for Gemini: {original_bytes} -> {prepared['bytes']} bytes "
+            f"({prepared['width']}x{prepared['height']}, quality {prepared['quality']})"
+        )
+        return blob
+    
+    def _cache_key(self, kind: str, prompt_version: int, generation_config: Optional[Dict],
+                   content_hash: str, options: Optional[Dict] = None) -> str:
+        """Result cache key covering everything that shapes a Gemini response"""
+        parts = [self.model_name, prompt_version, generation_config, content_hash]
+        if options is not None:
+            parts.append(options)
+        fingerprint = json.dumps(parts, sort_keys=True)
+        return f"{kind}:" + hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+    
+    def _hash_file(self, file_path: str) -> str:
+        """SHA-256 of a file's bytes"""
+        hash_sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
     
     def _create_simple_text_prompt(self, text: str) -> str:
         """Create a simple, reliable prompt for text analysis"""
@@ -138,15 +459,107 @@ Analyze this text for misinformation indicators. Rate the risk from 0-100 and ex
 
 Text: "{text}"
 
-Please respond with:
-Risk Score: [0-100]
-Main Issues: [list up to 3 key problems]
-Explanation: [brief explanation]
-Verification: [suggest 1-2 verification steps]
+{self._response_format()}
+
+Focus on: emotional manipulation, unsupported claims, suspicious language patterns, or misleading information.
+"""
+    
+    def _create_batch_text_prompt(self, texts: List[str]) -> str:
+        """Numbered multi-item version of the text prompt"""
+        numbered = "\n\n".join(f'[{number}] "{text}"' for number, text in enumerate(texts, 1))
+        return f"""
+Analyze each of the {len(texts)} numbered texts below for misinformation indicators. Rate each text's risk from 0-100 and explain why. Judge every text on its own.
+
+{numbered}
+
+{self._response_format(batch=True)}
 
 Focus on: emotional manipulation, unsupported claims, suspicious language patterns, or misleading information.
 """
 
+    def _create_image_prompt(self) -> str:
+        """Simple image analysis prompt"""
+        if self.structured_output:
+            response_format = """Respond with a JSON object containing:
+risk_score: manipulation risk from 0-100
+red_flags: problems found
+explanation: brief explanation
+verification_steps: 1-2 ways to check the image's origin"""
+        else:
+            response_format = """Response format:
+Risk Score: [0-100]
+Issues: [list problems found]
+Explanation: [brief explanation]"""
+        return f"""
+Analyze this image for potential manipulation or misleading content. 
+Rate manipulation risk 0-100 and list any concerns.
+
+Look for: digital manipulation, inconsistent lighting/shadows, misleading context, deepfakes.
+
+{response_format}
+"""
+    
+    def _response_format(self, batch: bool = False) -> str:
+        """Answer format instructions for the text prompts"""
+        if self.structured_output:
+            if batch:
+                heading = ("Respond with a JSON array holding one object per text, in the same order. "
+                           "Each object has the text's number in item, plus:")
+            else:
+                heading = "Respond with a JSON object containing:"
+            return f"""{heading}
+risk_score: 0-100
+red_flags: up to 3 key problems
+explanation: brief explanation
+verification_steps: 1-2 verification steps"""
+        
+        lines = """Risk Score: [0-100]
+Main Issues: [list up to 3 key problems]
+Explanation: [brief explanation]
+Verification: [suggest 1-2 verification steps]"""
+        if batch:
+            return ('Respond with one section per text, in the same order, each starting with a line "### <number>":\n'
+                    f"### 1\n{lines}")
+        return f"Please respond with:\n{lines}"
+    
+    def _parse_response(self, response_text: str) -> Optional[Dict]:
+        """Parse a single-item answer in the configured output mode (None if rejected)"""
+        if self.structured_output:
+            return self._validate_structured(self._decode_structured(response_text))
+        # Simple parsing instead of complex JSON
+        return self._parse_simple_response(response_text)
+    
+    def _decode_structured(self, response_text: str, expect_list: bool = False):
+        """json.loads a structured answer, counting decode time and failures"""
+        start = time.perf_counter()
+        try:
+            data = json.loads(response_text)
+        except ValueError as e:
+            metrics.increment('gemini_structured.decode_errors')
+            logger.warning(f"Gemini returned invalid JSON: {str(e)}")
+            return None
+        finally:
+            metrics.increment('gemini_structured.parse_us', int((time.perf_counter() - start) * 1e6))
+        if expect_list and not isinstance(data, list):
+            metrics.increment('gemini_structured.rejected')
+            logger.warning("Gemini batch response is not a JSON array")
+            return None
+        return data
+    
+    def _validate_structured(self, data, extra_fields: tuple = ()) -> Optional[Dict]:
+        """Strictly validate one decoded analysis and add the derived confidence"""
+        if data is None:
+            return None
+        try:
+            analysis = validate_analysis(data, extra_fields)
+        except ValueError as e:
+            metrics.increment('gemini_structured.rejected')
+            logger.warning(f"Gemini response failed schema validation: {str(e)}")
+            return None
+        metrics.increment('gemini_structured.parsed')
+        analysis['ai_confidence'] = 'high' if analysis['risk_score'] > 0 else 'medium'
+        return analysis
+    
     def _parse_simple_response(self, response_text: str) -> Dict:
         """Parse simple AI response format"""
         try:
@@ -212,8 +625,24 @@ Focus on: emotional manipulation, unsupported claims, suspicious language patter
                 'verification_steps': ["Manually verify information"],
                 'ai_confidence': 'low'
             }
-    def _get_fallback_analysis(self) -> Dict:
-        """Provide fallback analysis when AI is unavailable"""
+    def _get_fallback_analysis(self, text: str = None, degraded: bool = False) -> Dict:
+        """
+        Provide fallback analysis when AI is unavailable (the local model's, given text)
+        
+        degraded marks a stand-in for a Gemini call that failed, so callers
+        don't cache it past the outage
+        """
+        if text is not None and self.local_model is not None:
+            metrics.increment('local_model.fallback')
+            analysis = self.local_model.analyze(text)
+        else:
+            analysis = self._unavailable_analysis()
+        if degraded:
+            analysis['degraded'] = True
+        return analysis
+    
+    def _unavailable_analysis(self) -> Dict:
+        """Placeholder result when neither Gemini nor the local model can answer"""
         return {
             'risk_score': 0,
             'red_flags': [],
@@ -0,0 +1,508 @@
+"""
+Single-pass HTML feature extraction
+Collects everything URLAnalyzer needs from a page (title, meta tags, quality
+markers, links, social signals and main-content text) while the document is
+being tokenized, without building a parse tree
+
+The results match what the BeautifulSoup html.parser tree gives for the same
+markup: tags are opened and closed, whitespace-only strings collapsed and
+script/style/template text typed the same way, so the old find/find_all
+based extraction and this one agree
+
+Two tokenizers can drive the collector: lxml (libxml2, in C) when it is
+installed, and the standard library's html.parser otherwise. They agree on
+ordinary pages; on badly broken markup libxml2 may repair the structure
+differently. Compare them on saved pages with:
+
+    python -m modules.html_extractor benchmark pages/*.html
+"""
+import argparse
+import glob
+import re
+import sys
+import time
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Union
+import logging
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; html.parser is always available
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+EMPTY_ELEMENT_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+PRESERVE_WHITESPACE_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+# Text inside these is script, stylesheet, template or ruby text, never page text
+STRING_CONTAINER_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+# Removed before the main content, meta tags and markers are looked at
+PRUNED_TAGS = frozenset(['script', 'style', 'nav', 'header', 'footer'])
+
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+_MAIN_CONTENT_CLASS_RE = re.compile(r'content|article|post|main')
+_AD_CLASS_RE = re.compile(r'ad|advertisement|banner|popup')
+_AUTHOR_NAME_RE = re.compile(r'author')
+_AUTHOR_CLASS_RE = re.compile(r'author|byline')
+_DATE_NAME_RE = re.compile(r'date|publish')
+_DATE_CLASS_RE = re.compile(r'date|publish|time')
+_COMMENT_CLASS_RE = re.compile(r'comment|discuss')
+_SHARE_CLASS_RE = re.compile(r'share|social|twitter|facebook')
+_OG_PROPERTY_RE = re.compile(r'^og:')
+_EMBED_CLASS_RE = re.compile(r'twitter|facebook|instagram')
+
+# Meta lookups: (attribute, value) pairs matched exactly on <meta> tags
+META_RULES = {
+    'author': ('name', 'author'),
+    'article_author': ('property', 'article:author'),
+    'published_time': ('property', 'article:published_time'),
+    'publish_date': ('name', 'publish-date'),
+    'description': ('name', 'description'),
+    'og_description': ('property', 'og:description'),
+    'keywords': ('name', 'keywords')
+}
+
+# Kinds of string; only TEXT (outside string containers) and CDATA are page text
+TEXT, CDATA, COMMENT, DOCTYPE, DECLARATION, PI = 'text', 'cdata', 'comment', 'doctype', 'declaration', 'pi'
+
+
+def _search(pattern: re.Pattern, value: Optional[str]) -> bool:
+    return value is not None and pattern.search(value) is not None
+
+
+class _OpenElement:
+    """An element on the open-element stack"""
+    __slots__ = ('name', 'pruned')
+
+    def __init__(self, name: str, pruned: bool):
+        self.name = name
+        self.pruned = pruned
+
+
+class PageFeatureCollector:
+    """
+    Consumes start tag, end tag and text events and accumulates page features
+
+    Mirrors how BeautifulSoup turns the same events into a tree: an end tag
+    closes the most recent open element of that name (and everything opened
+    after it) and is ignored when none is open; text is buffered and becomes
+    one string at the next tag or comment boundary
+    """
+
+    def __init__(self):
+        self.stack: List[_OpenElement] = []
+        self.open_counts: Counter = Counter()
+        self.container_depth = 0
+        self.preserve_depth = 0
+        self.pending_data: List[str] = []
+
+        # Page text outside pruned elements, in document order
+        self.texts: List[str] = []
+        self.title_element: Optional[_OpenElement] = None
+        self.title_parts: Optional[List[str]] = None
+        self.title_open = False
+        # First main, article and content-like div: element and its [start, end) range in texts
+        self.candidates: Dict[str, List] = {}
+
+        self.meta: Dict[str, Dict[str, str]] = {}
+        self.time_attrs: Optional[Dict[str, str]] = None
+        self.ad_count = 0
+        self.has_author_markup = False
+        self.has_date_markup = False
+        self.has_comments = False
+        self.links: List[str] = []
+        self.sharing_buttons = False
+        self.social_meta = False
+        self.embedded_social = False
+
+    def handle_starttag(self, name: str, attrs: Dict[str, str]) -> None:
+        self.end_data()
+        pruned = name in PRUNED_TAGS or (bool(self.stack) and self.stack[-1].pruned)
+        element = _OpenElement(name, pruned)
+        self.stack.append(element)
+        self.open_counts[name] += 1
+        if name in STRING_CONTAINER_TAGS:
+            self.container_depth += 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+
+        # The title is read before anything is pruned
+        if name == 'title' and self.title_element is None:
+            self.title_element = element
+            self.title_parts = []
+            self.title_open = True
+        if not pruned:
+            self._collect(name, attrs, element)
+
+    def _collect(self, name: str, attrs: Dict[str, str], element: _OpenElement) -> None:
+        """Record the features of an element outside the pruned ones"""
+        css_class = attrs.get('class')
+        if name == 'main' or name == 'article':
+            self._add_candidate(name, element)
+        elif name == 'div':
+            if _search(_MAIN_CONTENT_CLASS_RE, css_class):
+                self._add_candidate('div', element)
+
+        if name == 'meta':
+            for rule, (attribute, value) in META_RULES.items():
+                if rule not in self.meta and attrs.get(attribute) == value:
+                    self.meta[rule] = attrs
+            if not self.social_meta and _search(_OG_PROPERTY_RE, attrs.get('property')):
+                self.social_meta = True
+        elif name == 'time' and self.time_attrs is None:
+            self.time_attrs = attrs
+        elif name == 'a' and 'href' in attrs:
+            self.links.append(attrs['href'])
+
+        if css_class is None:
+            return
+        if name in ('iframe', 'ins', 'div') and _search(_AD_CLASS_RE, css_class):
+            self.ad_count += 1
+        if (not self.has_author_markup and name in ('meta', 'span', 'div')
+                and _search(_AUTHOR_NAME_RE, attrs.get('name')) and _search(_AUTHOR_CLASS_RE, css_class)):
+            self.has_author_markup = True
+        if (not self.has_date_markup and name in ('meta', 'time', 'span')
+                and _search(_DATE_NAME_RE, attrs.get('name')) and _search(_DATE_CLASS_RE, css_class)):
+            self.has_date_markup = True
+        if name in ('div', 'section') and _search(_COMMENT_CLASS_RE, css_class):
+            self.has_comments = True
+        if name in ('a', 'div', 'button') and _search(_SHARE_CLASS_RE, css_class):
+            self.sharing_buttons = True
+        if name in ('iframe', 'blockquote') and _search(_EMBED_CLASS_RE, css_class):
+            self.embedded_social = True
+
+    def _add_candidate(self, kind: str, element: _OpenElement) -> None:
+        if kind not in self.candidates:
+            self.candidates[kind] = [element, len(self.texts), None]
+
+    def handle_endtag(self, name: str) -> None:
+        self.end_data()
+        if not self.open_counts.get(name):
+            return
+        while self.stack:
+            element = self._pop()
+            if element.name == name:
+                break
+
+    def _pop(self) -> _OpenElement:
+        element = self.stack.pop()
+        self.open_counts[element.name] -= 1
+        if element.name in STRING_CONTAINER_TAGS:
+            self.container_depth -= 1
+        if element.name in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+        if element is self.title_element:
+            self.title_open = False
+        for candidate in self.candidates.values():
+            if candidate[0] is element:
+                candidate[2] = len(self.texts)
+        return element
+
+    def handle_data(self, data: str) -> None:
+        self.pending_data.append(data)
+
+    def end_data(self, kind: str = TEXT) -> None:
+        """Turn the buffered text into one string of the given kind"""
+        if not self.pending_data:
+            return
+        data = ''.join(self.pending_data)
+        self.pending_data = []
+        if not self.preserve_depth:
+            for char in data:
+                if char not in _ASCII_SPACES:
+                    break
+            else:
+                data = '\n' if '\n' in data else ' '
+
+        if kind == TEXT and self.container_depth:
+            return
+        if kind != TEXT and kind != CDATA:
+            return
+        if self.title_open:
+            self.title_parts.append(data)
+        if not (self.stack and self.stack[-1].pruned):
+            self.texts.append(data)
+
+    def close(self) -> Dict:
+        """
+        Close any open elements and return the collected features
+
+        Returns:
+            Dictionary with the title (None without a <title>), the raw
+            main-content text, first matching meta tags by META_RULES name,
+            the first <time> element's attributes, marker counts and flags,
+            link hrefs in document order and social signal flags
+        """
+        self.end_data()
+        while self.stack:
+            self._pop()
+
+        main_text = None
+        for kind in ('main', 'article', 'div'):
+            if kind in self.candidates:
+                _, start, end = self.candidates[kind]
+                main_text = ''.join(self.texts[start:end])
+                break
+        if main_text is None:
+            main_text = ''.join(self.texts)
+
+        return {
+            'title': ''.join(self.title_parts) if self.title_parts is not None else None,
+            'main_text': main_text,
+            'meta': self.meta,
+            'time': self.time_attrs,
+            'ad_count': self.ad_count,
+            'has_author_markup': self.has_author_markup,
+            'has_date_markup': self.has_date_markup,
+            'has_comments': self.has_comments,
+            'links': self.links,
+            'sharing_buttons': self.sharing_buttons,
+            'social_meta': self.social_meta,
+            'embedded_social': self.embedded_social
+        }
+
+
+class _FeatureHTMLParser(HTMLParser):
+    """html.parser tokenizer feeding a PageFeatureCollector the way bs4's html.parser builder feeds a tree"""
+
+    _DECIMAL_REFERENCE_RE = re.compile('^([0-9]+)(.*)')
+    _HEX_REFERENCE_RE = re.compile('^([0-9a-f]+)(.*)')
+
+    def __init__(self, collector: PageFeatureCollector):
+        super().__init__(convert_charrefs=False)
+        self.collector = collector
+        self.already_closed_empty_element: List[str] = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        # Later duplicates of an attribute replace earlier ones
+        self.collector.handle_starttag(tag, {key: '' if value is None else value for key, value in attrs})
+        if handle_empty_element and tag in EMPTY_ELEMENT_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_empty_element.append(tag)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_empty_element:
+            # The end tag of a void element that was closed when it opened
+            self.already_closed_empty_element.remove(tag)
+        else:
+            self.collector.handle_endtag(tag)
+
+    def handle_data(self, data):
+        self.collector.handle_data(data)
+
+    def handle_charref(self, name):
+        pattern = self._DECIMAL_REFERENCE_RE
+        base = 10
+        if name.startswith(('x', 'X')):
+            name = name[1:]
+            pattern = self._HEX_REFERENCE_RE
+            base = 16
+        extra_data = ''
+        try:
+            codepoint = int(name, base)
+        except ValueError:
+            match = pattern.search(name)
+            if match is None:
+                codepoint = None
+                extra_data = name
+            else:
+                codepoint = int(match.group(1), base)
+                extra_data = match.group(2)
+        dereferenced = '' if codepoint is None else UnicodeDammit.numeric_character_reference(codepoint)[0]
+        self.collector.handle_data(dereferenced)
+        self.collector.handle_data(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.collector.handle_data(character if character is not None else f'&{name}')
+
+    def _special_string(self, data: str, kind: str) -> None:
+        self.collector.end_data()
+        self.collector.handle_data(data)
+        self.collector.end_data(kind)
+
+    def handle_comment(self, data):
+        self._special_string(data, COMMENT)
+
+    def handle_decl(self, decl):
+        self._special_string(decl[len('DOCTYPE '):], DOCTYPE)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self._special_string(data[len('CDATA['):], CDATA)
+        else:
+            self._special_string(data, DECLARATION)
+
+    def handle_pi(self, data):
+        self._special_string(data, PI)
+
+
+class _LxmlFeatureTarget:
+    """lxml parser target feeding a PageFeatureCollector the way bs4's lxml builder feeds a tree"""
+
+    def __init__(self, collector: PageFeatureCollector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.handle_starttag(tag, dict(attrib))
+
+    def end(self, tag):
+        self.collector.handle_endtag(tag)
+
+    def data(self, data):
+        self.collector.handle_data(data)
+
+    def _special_string(self, data: str, kind: str) -> None:
+        self.collector.end_data()
+        self.collector.handle_data(data)
+        self.collector.end_data(kind)
+
+    def comment(self, text):
+        self._special_string(text, COMMENT)
+
+    def doctype(self, name, pubid, system):
+        self._special_string(name or '', DOCTYPE)
+
+    def pi(self, target, data=None):
+        self._special_string(f'{target} {data}' if data else target, PI)
+
+    def close(self):
+        return self.collector.close()
+
+
+def _parse_with_html_parser(markup: str) -> Dict:
+    collector = PageFeatureCollector()
+    parser = _FeatureHTMLParser(collector)
+    parser.feed(markup)
+    parser.close()
+    return collector.close()
+
+
+def _parse_with_lxml(markup: str) -> Dict:
+    parser = etree.HTMLParser(target=_LxmlFeatureTarget(PageFeatureCollector()), no_network=True)
+    parser.feed(markup)
+    return parser.close()
+
+
+PARSER_BACKENDS = {
+    'lxml': _parse_with_lxml,
+    'html.parser': _parse_with_html_parser
+}
+
+
+def available_backends() -> List[str]:
+    """Installed parser backends, fastest first"""
+    return [name for name in PARSER_BACKENDS if name != 'lxml' or etree is not None]
+
+
+def resolve_backend(name: str = 'auto') -> str:
+    """
+    Pick the parser backend to use
+
+    Args:
+        name: 'auto' (lxml when installed, else html.parser), 'lxml' or 'html.parser'
+
+    Returns:
+        Name of an installed backend; a requested but missing lxml falls back to html.parser
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    name = (name or 'auto').lower()
+    if name != 'auto' and name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser '{name}'; use auto, {' or '.join(PARSER_BACKENDS)}")
+    if name in ('auto', 'lxml') and etree is not None:
+        return 'lxml'
+    if name == 'lxml':
+        logger.warning("HTML_PARSER is 'lxml' but lxml is not installed; using html.parser")
+    return 'html.parser'
+
+
+def extract_page_features(markup: Union[bytes, str], backend: Optional[str] = None) -> Dict:
+    """
+    Extract page features from HTML in one pass
+
+    Args:
+        markup: Page body; bytes are decoded the way BeautifulSoup decodes them
+        backend: Parser backend name (see resolve_backend); the fastest installed one by default
+
+    Returns:
+        Feature dictionary (see PageFeatureCollector.close)
+    """
+    if isinstance(markup, bytes):
+        markup = UnicodeDammit(markup, is_html=True).unicode_markup
+        if markup is None:
+            raise ValueError('Could not decode page content')
+    return PARSER_BACKENDS[resolve_backend(backend or 'auto')](markup)
+
+
+def benchmark(paths: List[str], url: str = 'https://example.com/', repeat: int = 3) -> int:
+    """
+    Time every installed backend over saved pages and check that the
+    title, content, meta info, links, social signals and red flags agree
+
+    Returns:
+        Number of pages on which the backends disagree
+    """
+    from .url_analyzer import URLAnalyzer
+
+    analyzer = URLAnalyzer()
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as page:
+            pages.append((path, page.read()))
+    backends = available_backends()
+    print(f'{len(pages)} pages, {sum(len(body) for _, body in pages) / 1e6:.1f} MB, backends: {", ".join(backends)}')
+
+    results = {}
+    for name in backends:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, body in pages:
+                extract_page_features(body, backend=name)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f'{name:12} {elapsed * 1000:9.1f} ms per pass  {elapsed * 1000 / max(len(pages), 1):7.2f} ms per page')
+        results[name] = []
+        for _, body in pages:
+            red_flags = []
+            analysis = analyzer.analyze_page_html(body, url, red_flags, backend=name)
+            results[name].append(dict(analysis, red_flags=red_flags))
+
+    mismatches = 0
+    for index, (path, _) in enumerate(pages):
+        analyses = [results[name][index] for name in backends]
+        if any(analysis != analyses[0] for analysis in analyses[1:]):
+            mismatches += 1
+            fields = sorted(key for key in analyses[0] if any(a.get(key) != analyses[0].get(key) for a in analyses[1:]))
+            print(f'MISMATCH {path}: {", ".join(fields)}')
+    print(f'{mismatches} of {len(pages)} pages differ between backends')
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the parser benchmark"""
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends on saved pages')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    benchmark_parser = subparsers.add_parser('benchmark', help='Time the backends and check their output agrees')
+    benchmark_parser.add_argument('pages', nargs='+', help='Saved HTML files (glob patterns are expanded)')
+    benchmark_parser.add_argument('--url', default='https://example.com/',
+                                  help='Page URL used to tell external links apart')
+    benchmark_parser.add_argument('--repeat', type=int, default=3, help='Timed passes per backend')
+
+    args = parser.parse_args(argv)
+    paths = [path for pattern in args.pages for path in (sorted(glob.glob(pattern)) or [pattern])]
+    return 1 if benchmark(paths, url=args.url, repeat=args.repeat) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+HTTP caching helpers
+URL normalization for cache keys and the parts of RFC 9111 needed to cache
+fetched pages: Cache-Control parsing, freshness lifetime and conditional
+request headers
+"""
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for use as a cache key
+
+    Lowercases the scheme and host, drops default ports and the fragment,
+    and uses '/' for an empty path; the query is kept as is since parameter
+    order can matter to the server
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or port == _DEFAULT_PORTS.get(scheme) else f'{host}:{port}'
+    userinfo = parts.netloc.rpartition('@')[0]
+    if userinfo:
+        netloc = f'{userinfo}@{netloc}'
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Cache-Control directives, lowercased, mapped to their argument (None when bare)"""
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if argument else None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], default: float, maximum: float) -> float:
+    """
+    Seconds a response may be reused without revalidation
+
+    Args:
+        headers: Response headers
+        default: Lifetime when the server gives none
+        maximum: Upper bound on any lifetime the server asks for
+
+    Returns:
+        0 for no-cache, otherwise max-age, else Expires relative to Date,
+        else default, capped at maximum
+    """
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0.0
+    max_age = directives.get('max-age')
+    if max_age is not None:
+        try:
+            return min(max(float(max_age), 0.0), maximum)
+        except ValueError:
+            # An invalid max-age makes the response stale (RFC 9111 4.2.1)
+            return 0.0
+    if 'Expires' in headers:
+        expires = _parse_http_date(headers['Expires'])
+        if expires is None:
+            return 0.0
+        date = _parse_http_date(headers.get('Date')) or time.time()
+        return min(max(expires - date, 0.0), maximum)
+    return min(default, maximum)
+
+
+def is_storable(headers: Mapping[str, str]) -> bool:
+    """False when the response forbids caching (Cache-Control: no-store)"""
+    return 'no-store' not in parse_cache_control(headers.get('Cache-Control'))
+
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers revalidating a stored response"""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
@@ -1,11 +1,16 @@
 from PIL import Image, ExifTags
 from PIL.ExifTags import TAGS
+import copy
 import hashlib
 import os
-from typing import Dict, List
+from contextlib import nullcontext
+from typing import Dict, List, Optional
 import logging
 import numpy as np
 
+from .cache import TTLCache
+from .disk_cache import get_disk_cache
+
 logger = logging.getLogger(__name__)
 
 class ImageAnalyzer:
@@ -19,23 +24,51 @@ class ImageAnalyzer:
             'inconsistent_lighting',
             'unusual_artifacts'
         ]
+        
+        # Results keyed by file content hash and extension (the extension
+        # feeds the format mismatch check), persisted on disk
+        self.cache = TTLCache(
+            max_entries=int(os.getenv('IMAGE_CACHE_SIZE', 1000)),
+            ttl=float(os.getenv('IMAGE_CACHE_TTL', 7 * 24 * 3600)),
+            name='image_analysis',
+            disk=get_disk_cache(),
+            namespace='image_analysis'
+        )
     
-    def analyze(self, image_path: str) -> Dict:
+    def analyze(self, image_path: str, image: Optional[Image.Image] = None) -> Dict:
         """
         Analyze image for manipulation indicators
         
         Args:
             image_path: Path to the image file
+            image: The same image already opened by the caller, shared instead of
+                decoding the file again (left open)
             
         Returns:
             Dictionary containing analysis results
         """
+        file_hash = self._calculate_file_hash(image_path)
+        if not file_hash:
+            return self._analyze_image(image_path, image=image)
+        
+        cache_key = file_hash + os.path.splitext(image_path)[1].lower()
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = self._analyze_image(image_path, file_hash, image)
+        if result['file_hash']:
+            self.cache.set(cache_key, result)
+        return copy.deepcopy(result)
+    
+    def _analyze_image(self, image_path: str, file_hash: str = None, image: Optional[Image.Image] = None) -> Dict:
+        """Run the full image analysis"""
         try:
             red_flags = []
             risk_score = 0
             
-            # Load image
-            with Image.open(image_path) as img:
+            # Load image (a caller's image stays open for its other users)
+            with nullcontext(image) if image is not None else Image.open(image_path) as img:
                 # Basic image information
                 image_info = self._get_image_info(img)
                 
@@ -65,7 +98,7 @@ class ImageAnalyzer:
                 'risk_score': final_score,
                 'red_flags': red_flags,
                 'image_info': image_info,
-                'file_hash': self._calculate_file_hash(image_path),
+                'file_hash': file_hash or self._calculate_file_hash(image_path),
                 'reverse_search_info': reverse_search_info,
                 'technical_details': {
                     'exif_score': exif_score,
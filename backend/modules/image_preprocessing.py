@@ -0,0 +1,109 @@
+"""
+Image preparation for AI analysis
+Downscales and re-encodes images before they are uploaded to Gemini Vision,
+dropping EXIF and other metadata and keeping the payload under a byte budget
+"""
+import io
+from typing import Dict, Tuple
+import logging
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+_MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp'}
+
+
+class ImagePreprocessor:
+    """Resizes and re-encodes images to a bounded, metadata-free payload"""
+
+    def __init__(self, max_edge: int = 1536, quality: int = 85, image_format: str = 'JPEG',
+                 target_bytes: int = 1024 * 1024, min_quality: int = 40, min_edge: int = 256):
+        """
+        Args:
+            max_edge: Longest side in pixels after resizing
+            quality: Starting encoder quality (1-95)
+            image_format: 'JPEG' or 'WEBP'
+            target_bytes: Payload size to stay under; quality, then size, is reduced to meet it
+            min_quality: Lowest quality tried before shrinking the image further
+            min_edge: Longest side below which the image is no longer shrunk
+        """
+        image_format = image_format.upper()
+        if image_format not in _MIME_TYPES:
+            raise ValueError(f"Unsupported image format '{image_format}'; use JPEG or WEBP")
+        self.max_edge = max_edge
+        self.quality = quality
+        self.image_format = image_format
+        self.target_bytes = target_bytes
+        self.min_quality = min_quality
+        self.min_edge = min_edge
+
+    def settings(self) -> Dict:
+        """Parameters that shape the output (part of result cache keys)"""
+        return {
+            'max_edge': self.max_edge,
+            'quality': self.quality,
+            'format': self.image_format,
+            'target_bytes': self.target_bytes
+        }
+
+    def prepare(self, image: Image.Image) -> Tuple[Dict, Dict]:
+        """
+        Produce an upload-ready copy of an image; the input is left untouched
+
+        Args:
+            image: Decoded (or lazily opened) PIL image
+
+        Returns:
+            (inline blob {'mime_type', 'data'} for generate_content,
+             stats with the output size, dimensions and quality)
+        """
+        # Bake in the EXIF orientation, since the metadata itself is dropped
+        prepared = ImageOps.exif_transpose(image)
+        prepared = self._flatten(prepared)
+        prepared.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+
+        quality = self.quality
+        data = self._encode(prepared, quality)
+        while len(data) > self.target_bytes:
+            if quality > self.min_quality:
+                quality = max(self.min_quality, quality - 10)
+            elif max(prepared.size) > self.min_edge:
+                prepared = prepared.resize(
+                    (max(1, prepared.width * 3 // 4), max(1, prepared.height * 3 // 4)), Image.LANCZOS
+                )
+            else:
+                logger.debug(f"Image stays at {len(data)} bytes, above the {self.target_bytes} byte target")
+                break
+            data = self._encode(prepared, quality)
+
+        blob = {'mime_type': _MIME_TYPES[self.image_format], 'data': data}
+        return blob, {'bytes': len(data), 'width': prepared.width, 'height': prepared.height, 'quality': quality}
+
+    def prepare_file(self, image_path: str) -> Tuple[Dict, Dict]:
+        """Open, decode and prepare an image file (see prepare)"""
+        with Image.open(image_path) as image:
+            if image.format == 'JPEG':
+                # Let the JPEG decoder scale down by a power of two while decoding
+                image.draft('RGB', (self.max_edge, self.max_edge))
+            return self.prepare(image)
+
+    def _flatten(self, image: Image.Image) -> Image.Image:
+        """First frame in RGB, with any transparency composited onto white"""
+        if getattr(image, 'n_frames', 1) > 1:
+            image.seek(0)
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            return background
+        if image.mode != 'RGB':
+            return image.convert('RGB')
+        # exif_transpose returns the same object when no rotation is needed
+        return image.copy()
+
+    def _encode(self, image: Image.Image, quality: int) -> bytes:
+        """Encode without EXIF, ICC or other metadata"""
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.image_format, quality=quality, optimize=self.image_format == 'JPEG')
+        return buffer.getvalue()
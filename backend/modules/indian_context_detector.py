@@ -3,7 +3,10 @@ Indian Misinformation Pattern Detector
 Specialized patterns for Indian context
 """
 import re
-from typing import Dict, List
+from typing import Dict, List, Union
+
+from .document import AnalyzedDocument
+from .keyword_engine import get_keyword_engine
 
 class IndianMisinfoDetector:
     """Detects misinformation patterns specific to Indian context"""
@@ -39,10 +42,15 @@ class IndianMisinfoDetector:
             'lottery winner.*claim prize',
             'investment returns.*%.*guaranteed'
         ]
+        
+        # Register keyword lists with the shared single-pass engine
+        self.keyword_engine = get_keyword_engine()
+        self.keyword_engine.register('indian.covid_myths', self.covid_myths)
     
-    def analyze_indian_context(self, text: str) -> Dict:
+    def analyze_indian_context(self, text: Union[str, AnalyzedDocument]) -> Dict:
         """Analyze text for Indian misinformation patterns"""
-        text_lower = text.lower()
+        doc = AnalyzedDocument.of(text)
+        text_lower = doc.lower
         risk_factors = []
         india_score = 0
         
@@ -53,10 +61,9 @@ class IndianMisinfoDetector:
                 india_score += 25
         
         # Check COVID myths
-        for myth in self.covid_myths:
-            if myth in text_lower:
-                risk_factors.append(f"COVID-19 misinformation: {myth}")
-                india_score += 30
+        for myth in doc.keyword_hits.found('indian.covid_myths'):
+            risk_factors.append(f"COVID-19 misinformation: {myth}")
+            india_score += 30
         
         # Check political patterns
         for pattern in self.political_patterns:
@@ -0,0 +1,150 @@
+"""
+Shared multi-pattern keyword engine
+Compiles every detector's keyword lists into one Aho-Corasick automaton so a
+document is scanned once instead of once per keyword
+"""
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordHits:
+    """Result of a single automaton pass over a lowercased document"""
+
+    def __init__(self, engine: 'KeywordEngine', hits: List[Tuple[str, str, int]]):
+        self._engine = engine
+        # (category, keyword, start offset) for every occurrence, in text order
+        self.hits = hits
+        self._offsets: Dict[Tuple[str, str], List[int]] = {}
+        for category, keyword, offset in hits:
+            self._offsets.setdefault((category, keyword), []).append(offset)
+
+    def contains(self, category: str, keyword: str) -> bool:
+        """Equivalent of `keyword in text` for a registered keyword"""
+        return (category, keyword) in self._offsets
+
+    def offsets(self, category: str, keyword: str) -> List[int]:
+        """Start offsets of every occurrence of a keyword"""
+        return self._offsets.get((category, keyword), [])
+
+    def found(self, category: str) -> List[str]:
+        """Keywords of a category present in the text, in registration order"""
+        return [keyword for keyword in self._engine.keywords(category)
+                if (category, keyword) in self._offsets]
+
+    def count(self, category: str) -> int:
+        """Number of registered keywords of a category present in the text"""
+        return len(self.found(category))
+
+
+class KeywordEngine:
+    """Aho-Corasick automaton over keyword lists registered by category"""
+
+    def __init__(self):
+        self._categories: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._automaton = None
+
+    def register(self, category: str, keywords: Iterable[str]) -> None:
+        """Register (or replace) the keyword list of a category"""
+        keywords = list(keywords)
+        with self._lock:
+            if self._categories.get(category) == keywords:
+                return
+            self._categories[category] = keywords
+            self._automaton = None
+
+    def keywords(self, category: str) -> List[str]:
+        """Keywords registered for a category, duplicates and order preserved"""
+        return self._categories.get(category, [])
+
+    def build(self) -> None:
+        """Compile the automaton now instead of on the first scan"""
+        self._get_automaton()
+
+    def scan(self, text: str) -> KeywordHits:
+        """
+        Run the automaton once over already-lowercased text
+
+        Args:
+            text: Lowercased document text
+
+        Returns:
+            KeywordHits with every occurrence tagged by category and offset
+        """
+        delta, outputs = self._get_automaton()
+        hits = []
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for category, keyword in outputs[state]:
+                    hits.append((category, keyword, position - len(keyword) + 1))
+        return KeywordHits(self, hits)
+
+    def _get_automaton(self) -> Tuple[List[Dict[str, int]], List[Tuple[Tuple[str, str], ...]]]:
+        """Return the compiled automaton, building it on first use"""
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    self._automaton = self._build()
+                automaton = self._automaton
+        return automaton
+
+    def _build(self) -> Tuple[List[Dict[str, int]], List[Tuple[Tuple[str, str], ...]]]:
+        """Build a deterministic Aho-Corasick automaton from the registered keywords"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[str, str]]] = [[]]
+
+        for category, keywords in self._categories.items():
+            for keyword in dict.fromkeys(keywords):
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append((category, keyword))
+
+        # Breadth-first pass computing failure links and folding them into a
+        # full transition table, so scanning never has to walk failure chains
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fail_state = fail[state]
+            outputs[state].extend(outputs[fail_state])
+            transitions = dict(delta[fail_state])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail_state].get(char, 0)
+                queue.append(next_state)
+
+        logger.info(f"Keyword engine compiled: {len(self._categories)} categories, {len(goto)} states")
+        return delta, [tuple(output) for output in outputs]
+
+
+_shared_engine: Optional[KeywordEngine] = None
+_shared_lock = threading.Lock()
+
+
+def get_keyword_engine() -> KeywordEngine:
+    """Process-wide engine that every text detector registers its lists with"""
+    global _shared_engine
+    if _shared_engine is None:
+        with _shared_lock:
+            if _shared_engine is None:
+                _shared_engine = KeywordEngine()
+    return _shared_engine
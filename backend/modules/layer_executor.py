@@ -0,0 +1,116 @@
+"""
+Concurrent analysis layer executor
+Fans independent analysis layers out on a bounded thread pool and joins them
+with per-layer timeouts
+"""
+import copy
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisLayer:
+    """A named unit of analysis work with its failure fallback and time budget"""
+
+    def __init__(self, name: str, func: Callable[[], Dict], fallback: Optional[Dict] = None,
+                 timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        # Result used when the layer raises or times out; None re-raises instead
+        self.fallback = fallback
+        self.timeout = timeout
+
+    def get_fallback(self, error: Exception) -> Dict:
+        """Fresh copy of the fallback result, or re-raise when there is none"""
+        if self.fallback is None:
+            raise error
+        return copy.deepcopy(self.fallback)
+
+
+class LayerExecutor:
+    """Runs analysis layers concurrently on a shared, bounded thread pool"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_MAX_WORKERS', 8))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix='analysis-layer')
+
+    def run(self, layers: List[AnalysisLayer], deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Run every layer concurrently and wait for all of them (or the deadline)
+
+        Args:
+            layers: Layers to execute
+            deadline: Optional overall budget in seconds; layers still running
+                when it passes are left to finish in the background and are
+                absent from the result
+
+        Returns:
+            Dictionary mapping layer name to its result (or fallback)
+        """
+        results = dict(self.iter_completed(layers, deadline))
+        return {layer.name: results[layer.name] for layer in layers if layer.name in results}
+
+    def iter_completed(self, layers: List[AnalysisLayer],
+                       deadline: Optional[float] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Run every layer concurrently, yielding (name, result) as each one finishes
+
+        A layer that fails or exceeds its timeout yields its fallback at that point.
+
+        Args:
+            layers: Layers to execute
+            deadline: Optional overall budget in seconds; iteration stops when it
+                passes and layers still running are not cancelled
+
+        Yields:
+            Tuples of layer name and result (or fallback), in completion order
+        """
+        start_time = time.monotonic()
+        pending = {self._pool.submit(layer.func): layer for layer in layers}
+        abandoned = False
+
+        try:
+            while pending:
+                deadlines = [start_time + layer.timeout for layer in pending.values()
+                             if layer.timeout is not None]
+                if deadline is not None:
+                    deadlines.append(start_time + deadline)
+                wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    layer = pending.pop(future)
+                    try:
+                        yield layer.name, future.result()
+                    except Exception as e:
+                        logger.warning(f"{layer.name} layer failed: {str(e)}")
+                        yield layer.name, layer.get_fallback(e)
+
+                now = time.monotonic()
+                for future, layer in list(pending.items()):
+                    if layer.timeout is not None and start_time + layer.timeout <= now:
+                        del pending[future]
+                        future.cancel()
+                        logger.warning(f"{layer.name} layer timed out after {layer.timeout}s")
+                        yield layer.name, layer.get_fallback(
+                            FutureTimeoutError(f"{layer.name} layer timed out"))
+
+                if pending and deadline is not None and start_time + deadline <= time.monotonic():
+                    logger.info(f"Deadline of {deadline}s reached; still running: "
+                                f"{', '.join(layer.name for layer in pending.values())}")
+                    abandoned = True
+                    return
+        finally:
+            # Consumer stopped early: don't start layers nobody will read
+            if not abandoned:
+                for future in pending:
+                    future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
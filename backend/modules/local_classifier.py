@@ -0,0 +1,230 @@
+"""
+Local statistical classifier
+Hashed word n-gram features with a multinomial naive Bayes model in NumPy,
+used to pre-screen or stand in for Gemini text analysis without a network call
+
+Train from a JSONL corpus (one {"text": ..., "label": 0|1} object per line):
+
+    python -m modules.local_classifier train corpus.jsonl models/local_classifier.npz
+"""
+import argparse
+import json
+import sys
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .normalization import normalize_claim
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+
+
+class HashedNgramFeatures:
+    """Maps text to sparse counts of hashed word n-grams"""
+
+    def __init__(self, n_features: int = 1 << 18, ngram_range: Tuple[int, int] = (1, 2)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+
+    def transform(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            text: Raw text
+
+        Returns:
+            Tuple of (feature indices, counts) for the text's n-grams
+        """
+        words = normalize_claim(text).split()
+        low, high = self.ngram_range
+        hashes = [
+            zlib.crc32(' '.join(words[i:i + n]).encode('utf-8')) % self.n_features
+            for n in range(low, high + 1)
+            for i in range(len(words) - n + 1)
+        ]
+        if not hashes:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        indices, counts = np.unique(np.array(hashes, dtype=np.int64), return_counts=True)
+        return indices, counts.astype(np.float32)
+
+
+class LocalClassifier:
+    """Binary misinformation classifier (label 1 = misinformation)"""
+
+    def __init__(self, feature_log_prob: np.ndarray, class_log_prior: np.ndarray,
+                 ngram_range: Tuple[int, int] = (1, 2)):
+        """
+        Args:
+            feature_log_prob: Array of shape (2, n_features) with per-class log P(feature)
+            class_log_prior: Array of shape (2,) with per-class log priors
+            ngram_range: Word n-gram sizes the model was trained with
+        """
+        self.feature_log_prob = feature_log_prob.astype(np.float32)
+        self.class_log_prior = class_log_prior.astype(np.float64)
+        self.features = HashedNgramFeatures(feature_log_prob.shape[1], ngram_range)
+        # Log-odds weight per feature: the model reduces to a linear score
+        self._weights = (self.feature_log_prob[1] - self.feature_log_prob[0]).astype(np.float64)
+        self._bias = float(self.class_log_prior[1] - self.class_log_prior[0])
+
+    @classmethod
+    def train(cls, texts: Iterable[str], labels: Iterable[int], n_features: int = 1 << 18,
+              ngram_range: Tuple[int, int] = (1, 2), alpha: float = 1.0) -> 'LocalClassifier':
+        """
+        Fit a multinomial naive Bayes model
+
+        Args:
+            texts: Training texts
+            labels: 1 for misinformation, 0 for reliable content
+            n_features: Number of hash buckets
+            ngram_range: Word n-gram sizes to use
+            alpha: Additive (Laplace) smoothing
+
+        Returns:
+            Trained classifier
+        """
+        features = HashedNgramFeatures(n_features, ngram_range)
+        feature_counts = np.zeros((2, n_features), dtype=np.float64)
+        class_counts = np.zeros(2, dtype=np.float64)
+
+        for text, label in zip(texts, labels):
+            indices, counts = features.transform(text)
+            np.add.at(feature_counts[label], indices, counts)
+            class_counts[label] += 1
+
+        if not class_counts.all():
+            raise ValueError('Training data needs examples of both labels')
+
+        smoothed = feature_counts + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        class_log_prior = np.log(class_counts) - np.log(class_counts.sum())
+        return cls(feature_log_prob, class_log_prior, ngram_range)
+
+    @classmethod
+    def load(cls, path: str) -> 'LocalClassifier':
+        """Load a model saved with save()"""
+        with np.load(path) as data:
+            version = int(data['format_version'])
+            if version != MODEL_FORMAT_VERSION:
+                raise ValueError(f'Unsupported model format version {version}')
+            return cls(data['feature_log_prob'], data['class_log_prior'],
+                       tuple(int(n) for n in data['ngram_range']))
+
+    def save(self, path: str) -> None:
+        """Write the model as a compressed .npz file"""
+        np.savez_compressed(
+            path,
+            format_version=np.array(MODEL_FORMAT_VERSION),
+            feature_log_prob=self.feature_log_prob,
+            class_log_prior=self.class_log_prior,
+            ngram_range=np.array(self.features.ngram_range)
+        )
+
+    def predict_proba(self, text: str) -> float:
+        """Probability that a text is misinformation"""
+        indices, counts = self.features.transform(text)
+        log_odds = self._bias + float(counts @ self._weights[indices])
+        return float(1.0 / (1.0 + np.exp(-np.clip(log_odds, -500, 500))))
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        """Misinformation probabilities for many texts, scored in one vectorized pass"""
+        rows = [self.features.transform(text) for text in texts]
+        # CSR-style layout: every row's features concatenated, plus the row each belongs to
+        indices = np.concatenate([row_indices for row_indices, _ in rows]) if rows else np.empty(0, dtype=np.int64)
+        counts = np.concatenate([row_counts for _, row_counts in rows]) if rows else np.empty(0, dtype=np.float32)
+        row_ids = np.repeat(np.arange(len(rows)), [len(row_indices) for row_indices, _ in rows])
+        # bincount sums each row's weighted counts; rows without features score 0
+        log_odds = self._bias + np.bincount(row_ids, weights=counts * self._weights[indices], minlength=len(rows))
+        return 1.0 / (1.0 + np.exp(-np.clip(log_odds, -500, 500)))
+
+    def analyze(self, text: str) -> Dict:
+        """Risk assessment in the same shape as GeminiAnalyzer results"""
+        probability = self.predict_proba(text)
+        risk_score = int(round(probability * 100))
+        red_flags = []
+        if probability >= 0.5:
+            red_flags.append('Wording resembles known misinformation (local model)')
+        return {
+            'risk_score': risk_score,
+            'red_flags': red_flags,
+            'explanation': (
+                f'Local statistical model estimates a {risk_score}% likelihood that this text '
+                'is misinformation, based on word patterns seen in previously labelled content.'
+            ),
+            'verification_steps': [
+                'Verify key claims with trusted sources',
+                'Check fact-checking websites like Snopes or FactCheck.org'
+            ],
+            'ai_confidence': 'local-model',
+            'misinformation_probability': round(probability, 4)
+        }
+
+
+def _read_corpus(path: str, text_field: str, label_field: str) -> Tuple[List[str], List[int]]:
+    """Read texts and 0/1 labels from a JSONL file"""
+    texts, labels = [], []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = record[label_field]
+            if isinstance(label, bool):
+                label = int(label)
+            if label not in (0, 1):
+                raise ValueError(f'Line {line_number}: label must be 0/1 or true/false')
+            texts.append(record[text_field])
+            labels.append(label)
+    return texts, labels
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for training and scoring"""
+    parser = argparse.ArgumentParser(description='Train or run the local misinformation classifier')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help='Train a model from a JSONL corpus')
+    train_parser.add_argument('corpus', help='JSONL file with one labelled text per line')
+    train_parser.add_argument('output', help='Path of the .npz model file to write')
+    train_parser.add_argument('--text-field', default='text')
+    train_parser.add_argument('--label-field', default='label', help='Field holding 1 (misinformation) or 0')
+    train_parser.add_argument('--hash-bits', type=int, default=18, help='log2 of the number of hash buckets')
+    train_parser.add_argument('--max-ngram', type=int, default=2)
+    train_parser.add_argument('--alpha', type=float, default=1.0, help='Laplace smoothing')
+    train_parser.add_argument('--holdout', type=float, default=0.1,
+                              help='Fraction of the corpus held out to report accuracy')
+
+    predict_parser = subparsers.add_parser('predict', help='Score texts read one per line from stdin')
+    predict_parser.add_argument('model', help='Path of a trained .npz model file')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        texts, labels = _read_corpus(args.corpus, args.text_field, args.label_field)
+        order = np.random.RandomState(0).permutation(len(texts))
+        holdout_size = int(len(texts) * args.holdout)
+        held_out, training = order[:holdout_size], order[holdout_size:]
+
+        model = LocalClassifier.train(
+            [texts[i] for i in training], [labels[i] for i in training],
+            n_features=1 << args.hash_bits, ngram_range=(1, args.max_ngram), alpha=args.alpha
+        )
+        if holdout_size:
+            probabilities = model.predict_proba_batch([texts[i] for i in held_out])
+            accuracy = np.mean((probabilities >= 0.5) == np.array([labels[i] for i in held_out]))
+            print(f'Holdout accuracy: {accuracy:.3f} on {holdout_size} examples')
+        model.save(args.output)
+        print(f'Trained on {len(training)} examples; model written to {args.output}')
+        return 0
+
+    model = LocalClassifier.load(args.model)
+    lines = [line.rstrip('\n') for line in sys.stdin if line.strip()]
+    for text, probability in zip(lines, model.predict_proba_batch(lines)):
+        print(json.dumps({'text': text, 'misinformation_probability': round(float(probability), 4)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Long document handling for AI analysis
+Splits long text into sentence-aligned chunks, ranks them cheaply by claim
+density and keyword hits so only the most suspicious ones are sent to the
+model, and reduces the per-chunk verdicts into one
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .keyword_engine import KeywordEngine, get_keyword_engine
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_into_chunks(text: str, max_chars: int = 1000) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most max_chars characters
+
+    A single sentence longer than max_chars is split on whitespace
+    """
+    pieces = []
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f'{current} {piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ChunkRanker:
+    """Scores chunks by factual-claim pattern matches and registered keyword hits"""
+
+    def __init__(self, claim_patterns: Sequence[str], keyword_engine: Optional[KeywordEngine] = None,
+                 claim_weight: float = 2.0):
+        """
+        Args:
+            claim_patterns: Regular expressions matching factual claims
+            keyword_engine: Engine holding the detectors' keyword lists (shared engine by default)
+            claim_weight: Weight of a claim match relative to a keyword hit
+        """
+        self.claim_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in claim_patterns]
+        self.keyword_engine = keyword_engine or get_keyword_engine()
+        self.claim_weight = claim_weight
+
+    def score(self, chunk: str) -> float:
+        """Weighted claim matches plus keyword hits per 1000 characters"""
+        claims = sum(len(pattern.findall(chunk)) for pattern in self.claim_patterns)
+        # A keyword registered under several categories still counts once per occurrence
+        keywords = len({(keyword, offset) for _, keyword, offset in self.keyword_engine.scan(chunk.lower()).hits})
+        return (self.claim_weight * claims + keywords) * 1000 / max(len(chunk), 1)
+
+    def top_chunks(self, chunks: List[str], k: int) -> List[Tuple[int, str, float]]:
+        """
+        Pick the k highest-scoring chunks
+
+        Returns:
+            (index, chunk, score) for each pick, in document order
+        """
+        scored = [(index, chunk, self.score(chunk)) for index, chunk in enumerate(chunks)]
+        # Ties go to the earlier chunk, so unremarkable text degrades to a prefix
+        best = sorted(scored, key=lambda item: (-item[2], item[0]))[:k]
+        return sorted(best)
+
+
+def reduce_chunk_analyses(analyses: List[Tuple[int, Dict]], total_chunks: int) -> Dict:
+    """
+    Combine per-chunk analyses into one verdict
+
+    The riskiest chunk dominates, since one misleading section is enough to
+    make a document misleading, tempered by the average of the others
+
+    Args:
+        analyses: (chunk index, parsed analysis) for each analyzed chunk, in document order
+        total_chunks: Number of chunks the document was split into
+
+    Returns:
+        Analysis in the single-text result shape plus a 'long_document' summary
+    """
+    indices = [index for index, _ in analyses]
+    analyses = [analysis for _, analysis in analyses]
+    scores = [analysis.get('risk_score', 0) for analysis in analyses]
+    riskiest = analyses[scores.index(max(scores))]
+    risk_score = int(round(0.7 * max(scores) + 0.3 * sum(scores) / len(scores)))
+
+    # Concerns from the riskiest sections come first
+    by_risk = sorted(analyses, key=lambda analysis: -analysis.get('risk_score', 0))
+    red_flags = list(dict.fromkeys(flag for analysis in by_risk for flag in analysis.get('red_flags', [])))
+    verification_steps = list(dict.fromkeys(
+        step for analysis in by_risk for step in analysis.get('verification_steps', [])
+    ))
+
+    return {
+        'risk_score': risk_score,
+        'red_flags': red_flags[:5],
+        'explanation': (
+            f"Analyzed {len(analyses)} of {total_chunks} sections. "
+            f"Highest-risk section: {riskiest.get('explanation', '')}"
+        ),
+        'verification_steps': verification_steps[:3],
+        'ai_confidence': riskiest.get('ai_confidence', 'medium'),
+        'long_document': {
+            'total_chunks': total_chunks,
+            'analyzed_chunks': len(analyses),
+            'chunk_indices': indices,
+            'chunk_risk_scores': scores
+        }
+    }
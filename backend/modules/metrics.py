@@ -0,0 +1,28 @@
+"""
+Process-wide metrics registry
+Named counters shared by the analysis modules and reported by /api/metrics
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class MetricsRegistry:
+    """Thread-safe collection of named counters"""
+
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter, creating it at zero on first use"""
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self) -> Dict:
+        """Current value of every metric"""
+        with self._lock:
+            return {'counters': dict(self._counters)}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,97 @@
+"""
+Request micro-batching
+Items submitted from many threads within a short window are handed to one
+bulk call, and each caller gets back its own slice of the result
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from .metrics import metrics
+
+
+class MicroBatcher:
+    """Collects concurrent submissions into batches for a bulk function"""
+
+    def __init__(self, process_batch: Callable[[List[Any], List[Optional[float]]], List[Any]],
+                 window: float = 0.03, max_items: int = 8, name: str = 'batcher',
+                 max_concurrent_batches: int = 4):
+        """
+        Args:
+            process_batch: Called with a list of items and their deadlines; returns
+                one result per item, in order
+            window: Seconds to wait for more items after the first one of a batch arrives
+            max_items: Batch size that triggers an immediate flush
+            name: Prefix of the '<name>.batches' and '<name>.items' counters
+            max_concurrent_batches: Batches allowed to be processed at the same time
+        """
+        self.process_batch = process_batch
+        self.window = window
+        self.max_items = max_items
+        self.name = name
+        self.max_concurrent_batches = max_concurrent_batches
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any, deadline: Optional[float] = None) -> Future:
+        """
+        Queue an item; the returned future resolves to its result (or exception)
+        
+        Args:
+            item: Item to process
+            deadline: time.monotonic() value after which the caller stops waiting,
+                handed to process_batch with the item
+        """
+        self._start()
+        future = Future()
+        self._queue.put((item, deadline, future))
+        return future
+
+    def _start(self) -> None:
+        """Start the collector thread on first use (after any worker fork)"""
+        if self._executor is not None:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_batches, thread_name_prefix=self.name
+                )
+                threading.Thread(target=self._collect, name=f'{self.name}-collector', daemon=True).start()
+
+    def _collect(self) -> None:
+        """Cut the queue into batches by window and size and dispatch them"""
+        while True:
+            batch = [self._queue.get()]
+            flush_at = time.monotonic() + self.window
+            while len(batch) < self.max_items:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: List[tuple]) -> None:
+        """Process one batch and resolve its callers' futures"""
+        metrics.increment(f'{self.name}.batches')
+        metrics.increment(f'{self.name}.items', len(batch))
+        try:
+            results = self.process_batch([item for item, _, _ in batch],
+                                         [deadline for _, deadline, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f'{self.name}: expected {len(batch)} results, got {len(results)}')
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def pending(self) -> int:
+        """Items waiting to be batched"""
+        return self._queue.qsize()
@@ -0,0 +1,191 @@
+"""
+Near-duplicate text index
+MinHash signatures with LSH banding over recently analyzed texts, so
+lightly edited forwards (a changed number, an added greeting) can reuse
+an earlier verdict
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .normalization import normalize_claim
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _choose_bands(num_perm: int, threshold: float, recall: float = 0.95) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) for LSH banding
+
+    Uses the most selective split (most rows per band) that still makes a
+    pair at exactly the threshold a candidate with the given probability;
+    candidates are verified exactly, so false positives only cost time
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """Bounded, expiring MinHash/LSH index mapping texts to stored values"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 min_words: int = 8, max_entries: int = 10000, ttl: Optional[float] = None,
+                 seed: int = 1):
+        """
+        Args:
+            threshold: Minimum Jaccard similarity of word shingles to count as a match
+            num_perm: Number of MinHash permutations
+            shingle_size: Words per shingle
+            min_words: Texts shorter than this are neither indexed nor matched
+            max_entries: Maximum number of indexed texts (oldest are evicted first)
+            ttl: Seconds an entry stays matchable (None never expires)
+            seed: Seed for the permutation coefficients
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        # key -> (shingles, signature, value, expires_at)
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        # one dict per band: band bytes -> set of keys
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.matches = 0
+        self.lookups = 0
+
+    def shingles(self, text: str) -> Optional[np.ndarray]:
+        """Sorted unique 32-bit hashes of the text's word shingles, or None if too short"""
+        words = normalize_claim(text).split()
+        if len(words) < self.min_words:
+            return None
+        size = self.shingle_size
+        hashes = {
+            zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+            for i in range(len(words) - size + 1)
+        }
+        shingles = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        shingles.sort()
+        return shingles
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        """MinHash signature of a shingle hash set"""
+        # 32-bit hashes times 32-bit coefficients stay below 2**64
+        permuted = (np.outer(shingles, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def add(self, key: Hashable, text: str, value: Any) -> bool:
+        """
+        Index a text under key with the value to return for its near-duplicates
+
+        Returns:
+            False when the text is too short to be indexed
+        """
+        shingles = self.shingles(text)
+        if shingles is None:
+            return False
+        signature = self.signature(shingles)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (shingles, signature, value, expires_at)
+            for band, bucket_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(bucket_key, set()).add(key)
+
+            # Entries are in insertion order, so expired ones sit at the front
+            while self._entries:
+                oldest_key = next(iter(self._entries))
+                oldest_expiry = self._entries[oldest_key][3]
+                if len(self._entries) <= self.max_entries and \
+                        (oldest_expiry is None or oldest_expiry > time.monotonic()):
+                    break
+                self._remove(oldest_key)
+        return True
+
+    def query(self, text: str) -> Optional[Tuple[Hashable, Any, float]]:
+        """
+        Find the most similar indexed text at or above the threshold
+
+        Returns:
+            (key, value, jaccard similarity) of the best match, or None
+        """
+        shingles = self.shingles(text)
+        if shingles is None:
+            return None
+        signature = self.signature(shingles)
+        now = time.monotonic()
+
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, bucket_key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(bucket_key, ()))
+
+            best = None
+            for key in candidates:
+                other, _, value, expires_at = self._entries[key]
+                if expires_at is not None and expires_at <= now:
+                    self._remove(key)
+                    continue
+                shared = len(np.intersect1d(shingles, other, assume_unique=True))
+                similarity = shared / (len(shingles) + len(other) - shared)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (key, value, similarity)
+
+            if best is not None:
+                self.matches += 1
+            return best
+
+    def _band_keys(self, signature: np.ndarray):
+        """Bucket key for each LSH band of a signature"""
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry and its bucket memberships; caller holds the lock"""
+        _, signature, _, _ = self._entries.pop(key)
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][bucket_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Index size and match counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'bands': self.bands,
+                'rows': self.rows,
+                'lookups': self.lookups,
+                'matches': self.matches
+            }
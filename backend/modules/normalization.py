@@ -0,0 +1,36 @@
+"""
+Text normalization helpers
+Canonical forms used to build cache keys for trivially different inputs
+"""
+import hashlib
+import re
+import unicodedata
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]|_')
+
+# Emoji, pictographs, modifiers and invisible format characters (ZWJ,
+# variation selectors) that forwarded messages gain or lose as they spread
+_DECORATION_CATEGORIES = {'So', 'Sk', 'Cf', 'Co', 'Cs'}
+_VARIATION_SELECTORS = {chr(code) for code in range(0xFE00, 0xFE10)}
+
+
+def normalize_claim(claim: str) -> str:
+    """Fold case, punctuation and whitespace so equivalent claims share one key"""
+    claim = unicodedata.normalize('NFKC', claim).casefold()
+    claim = _PUNCTUATION_RE.sub(' ', claim)
+    return ' '.join(claim.split())
+
+
+def canonicalize_content(text: str) -> str:
+    """Fold case, whitespace, emoji and other decoration out of submitted content"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ''.join(
+        char for char in text
+        if char not in _VARIATION_SELECTORS and unicodedata.category(char) not in _DECORATION_CATEGORIES
+    )
+    return ' '.join(text.split())
+
+
+def content_fingerprint(text: str) -> str:
+    """SHA-256 of the canonical form of submitted content"""
+    return hashlib.sha256(canonicalize_content(text).encode('utf-8')).hexdigest()
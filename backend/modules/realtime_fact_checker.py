@@ -2,14 +2,30 @@ import asyncio
 import aiohttp
 import json
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
-from datetime import datetime, timedelta
-import hashlib
+from datetime import timedelta
+import os
 import re
 
+from .async_runtime import get_background_loop
+from .cache import TTLCache
+from .disk_cache import get_disk_cache
+from .document import AnalyzedDocument
+from .keyword_engine import get_keyword_engine
+from .normalization import normalize_claim
+
 logger = logging.getLogger(__name__)
 
+# Patterns matching factual claims; group 1 (or the whole match) is the claim
+CLAIM_PATTERNS = [
+    r'(?:according to|study shows|research proves|data indicates|scientists found|experts say|reports indicate|statistics show)\s+(.+?)(?:\.|,|;)',
+    r'(?:it is|this is|that is)\s+(proven|confirmed|verified|established)\s+(?:that\s+)?(.+?)(?:\.|,|;)',
+    r'(?:the fact is|the truth is|it\'s a fact that)\s+(.+?)(?:\.|,|;)',
+    r'(\d+%?\s+of\s+.+?)(?:\.|,|;)',
+    r'(evidence shows|research indicates|studies demonstrate)\s+(.+?)(?:\.|,|;)'
+]
+
 class RealTimeFactChecker:
     """
     Real-time fact-checking integration with multiple sources
@@ -43,17 +59,27 @@ class RealTimeFactChecker:
             }
         }
         
-        self.cache = {}
+        # Verified claim results keyed by normalized claim text, shared with
+        # other workers through the disk tier
         self.cache_expiry = timedelta(hours=24)
+        self.cache = TTLCache(
+            max_entries=int(os.getenv('FACT_CHECK_CACHE_SIZE', 10000)),
+            ttl=self.cache_expiry.total_seconds(),
+            max_bytes=int(os.getenv('FACT_CHECK_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+            name='fact_check_claims',
+            disk=get_disk_cache(),
+            namespace='fact_check'
+        )
+        
+        # Long-lived event loop owning one pooled ClientSession per source
+        self.event_loop = get_background_loop()
+        self.event_loop.add_shutdown_hook(self.close)
+        self.connection_pool_size = int(os.getenv('FACT_CHECK_POOL_SIZE', 20))
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._session_loop = None
         
         # Claim extraction patterns
-        self.claim_patterns = [
-            r'(?:according to|study shows|research proves|data indicates|scientists found|experts say|reports indicate|statistics show)\s+(.+?)(?:\.|,|;)',
-            r'(?:it is|this is|that is)\s+(proven|confirmed|verified|established)\s+(?:that\s+)?(.+?)(?:\.|,|;)',
-            r'(?:the fact is|the truth is|it\'s a fact that)\s+(.+?)(?:\.|,|;)',
-            r'(\d+%?\s+of\s+.+?)(?:\.|,|;)',
-            r'(evidence shows|research indicates|studies demonstrate)\s+(.+?)(?:\.|,|;)'
-        ]
+        self.claim_patterns = CLAIM_PATTERNS
         
         # Suspicious claim indicators
         self.suspicious_indicators = [
@@ -61,16 +87,33 @@ class RealTimeFactChecker:
             'suppressed evidence', 'cover-up', 'conspiracy', 'fake news',
             'hoax', 'propaganda', 'mainstream media lies'
         ]
+        
+        # Register keyword lists with the shared single-pass engine
+        self.keyword_engine = get_keyword_engine()
+        self.keyword_engine.register('fact_check.suspicious', self.suspicious_indicators)
+    
+    def check_claims(self, content: Union[str, AnalyzedDocument], content_type: str = 'text',
+                     timeout: Optional[float] = None) -> Dict:
+        """
+        Thread-safe synchronous entry point for Flask handlers
+        
+        Runs check_claims_comprehensive on the background event loop so
+        connection pools, DNS results and TLS sessions survive across requests
+        """
+        return self.event_loop.run(self.check_claims_comprehensive(content, content_type), timeout)
     
-    async def check_claims_comprehensive(self, content: str, content_type: str = 'text') -> Dict:
+    async def check_claims_comprehensive(self, content: Union[str, AnalyzedDocument],
+                                         content_type: str = 'text') -> Dict:
         """
         Comprehensive fact-checking across multiple sources
         """
         start_time = time.time()
         
         try:
+            doc = AnalyzedDocument.of(content)
+            
             # Extract claims from content
-            extracted_claims = self.extract_claims(content)
+            extracted_claims = self.extract_claims(doc)
             
             if not extracted_claims:
                 return {
@@ -89,31 +132,37 @@ class RealTimeFactChecker:
             # Generate recommendations
             recommendations = self.generate_fact_check_recommendations(fact_check_results)
             
-            return {
+            result = {
                 'total_claims': len(extracted_claims),
                 'extracted_claims': extracted_claims[:5],  # Limit for display
                 'fact_check_results': fact_check_results,
                 'overall_credibility': overall_credibility,
                 'source_breakdown': self.get_source_breakdown(fact_check_results),
                 'recommendations': recommendations,
-                'suspicious_indicators': self.detect_suspicious_indicators(content),
+                'suspicious_indicators': self.detect_suspicious_indicators(doc),
                 'processing_time': round(time.time() - start_time, 3)
             }
+            # Some source didn't answer: the credibility rests on partial evidence
+            if not all(self._is_fully_verified(claim_data) for claim_data in fact_check_results.values()):
+                result['degraded'] = True
+            return result
             
         except Exception as e:
             logger.error(f"Error in comprehensive fact-checking: {str(e)}")
             return {
                 'error': 'Fact-checking failed',
                 'message': str(e),
-                'processing_time': round(time.time() - start_time, 3)
+                'processing_time': round(time.time() - start_time, 3),
+                'degraded': True
             }
     
-    def extract_claims(self, content: str) -> List[str]:
+    def extract_claims(self, content: Union[str, AnalyzedDocument]) -> List[str]:
         """Extract factual claims from content using pattern matching"""
         claims = []
+        doc = AnalyzedDocument.of(content)
         
         # Clean content
-        content = re.sub(r'\s+', ' ', content.strip())
+        content = doc.normalized
         
         # Extract claims using patterns
         for pattern in self.claim_patterns:
@@ -127,8 +176,7 @@ class RealTimeFactChecker:
                     claims.append(claim)
         
         # Also extract sentences with strong factual indicators
-        sentences = content.split('.')
-        for sentence in sentences:
+        for sentence in doc.normalized_sentences:
             sentence = sentence.strip()
             if any(indicator in sentence.lower() for indicator in 
                    ['percent', '%', 'million', 'billion', 'study', 'research', 'data']):
@@ -141,51 +189,95 @@ class RealTimeFactChecker:
     
     async def verify_claims_parallel(self, claims: List[str]) -> Dict:
         """Verify claims across multiple fact-checking sources in parallel"""
-        results = {}
+        if self.event_loop.is_current():
+            return await self._verify_claims(claims, self._get_source_sessions())
         
+        # Running on some other event loop: fall back to a short-lived session
         async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-            tasks = []
+            sessions = {source_name: session for source_name in self.fact_check_sources}
+            return await self._verify_claims(claims, sessions)
+    
+    def _get_source_sessions(self) -> Dict[str, aiohttp.ClientSession]:
+        """Pooled ClientSession per source, bound to the running background loop"""
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            # First use, or the loop was restarted (e.g. after a fork)
+            self._sessions = {}
+            self._session_loop = loop
+        
+        for source_name in self.fact_check_sources:
+            session = self._sessions.get(source_name)
+            if session is None or session.closed:
+                self._sessions[source_name] = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=30),
+                    connector=aiohttp.TCPConnector(limit=self.connection_pool_size, ttl_dns_cache=300)
+                )
+        return self._sessions
+    
+    async def close(self) -> None:
+        """Close the pooled source sessions"""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+    
+    async def _verify_claims(self, claims: List[str], sessions: Dict[str, aiohttp.ClientSession]) -> Dict:
+        """Fan claim verification out across sources using the given sessions"""
+        results = {}
+        tasks = []
+        
+        for i, claim in enumerate(claims[:5]):  # Limit to 5 claims for performance
+            # Check cache first
+            cached_result = self.cache.get(normalize_claim(claim))
+            if cached_result is not None:
+                results[f'claim_{i+1}'] = dict(cached_result, claim_text=claim)
+                continue
             
-            for i, claim in enumerate(claims[:5]):  # Limit to 5 claims for performance
-                claim_hash = hashlib.md5(claim.encode()).hexdigest()
-                
-                # Check cache first
-                if claim_hash in self.cache:
-                    cache_entry = self.cache[claim_hash]
-                    if datetime.now() - cache_entry['timestamp'] < self.cache_expiry:
-                        results[f'claim_{i+1}'] = cache_entry['result']
-                        continue
-                
-                # Create verification tasks for each source
-                for source_name, source_config in self.fact_check_sources.items():
-                    if source_config['enabled']:
-                        task = self.verify_claim_with_source(session, claim, source_name, source_config)
-                        tasks.append((f'claim_{i+1}', claim, source_name, task))
+            # Create verification tasks for each source
+            for source_name, source_config in self.fact_check_sources.items():
+                if source_config['enabled']:
+                    task = self.verify_claim_with_source(sessions[source_name], claim,
+                                                         source_name, source_config)
+                    tasks.append((f'claim_{i+1}', claim, source_name, task))
+        
+        # Execute all tasks
+        if tasks:
+            task_results = await asyncio.gather(*[task[3] for task in tasks], return_exceptions=True)
             
-            # Execute all tasks
-            if tasks:
-                task_results = await asyncio.gather(*[task[3] for task in tasks], return_exceptions=True)
+            # Process results
+            for (claim_id, claim_text, source_name, _), result in zip(tasks, task_results):
+                if claim_id not in results:
+                    results[claim_id] = {
+                        'claim_text': claim_text,
+                        'source_results': {},
+                        'consensus': 'unknown'
+                    }
                 
-                # Process results
-                for (claim_id, claim_text, source_name, _), result in zip(tasks, task_results):
-                    if claim_id not in results:
-                        results[claim_id] = {
-                            'claim_text': claim_text,
-                            'source_results': {},
-                            'consensus': 'unknown'
-                        }
-                    
-                    if not isinstance(result, Exception):
-                        results[claim_id]['source_results'][source_name] = result
-                    else:
-                        logger.warning(f"Error checking {claim_id} with {source_name}: {result}")
+                if not isinstance(result, Exception):
+                    results[claim_id]['source_results'][source_name] = result
+                else:
+                    logger.warning(f"Error checking {claim_id} with {source_name}: {result}")
         
         # Calculate consensus for each claim
         for claim_id, claim_data in results.items():
             claim_data['consensus'] = self.calculate_claim_consensus(claim_data['source_results'])
         
+        # Cache claims that every enabled source answered
+        verified_claims = dict.fromkeys((claim_id, claim_text) for claim_id, claim_text, _, _ in tasks)
+        for claim_id, claim_text in verified_claims:
+            claim_data = results.get(claim_id)
+            if claim_data and self._is_fully_verified(claim_data):
+                self.cache.set(normalize_claim(claim_text), claim_data)
+        
         return results
     
+    def _is_fully_verified(self, claim_data: Dict) -> bool:
+        """True when every enabled source answered the claim without an error"""
+        enabled_sources = sum(1 for config in self.fact_check_sources.values() if config['enabled'])
+        answered = [result for result in claim_data['source_results'].values()
+                    if result.get('status') != 'error']
+        return len(answered) == enabled_sources
+    
     async def verify_claim_with_source(self, session: aiohttp.ClientSession, 
                                      claim: str, source_name: str, source_config: Dict) -> Dict:
         """Verify a single claim with a specific fact-checking source"""
@@ -443,13 +535,6 @@ class RealTimeFactChecker:
         
         return recommendations
     
-    def detect_suspicious_indicators(self, content: str) -> List[str]:
+    def detect_suspicious_indicators(self, content: Union[str, AnalyzedDocument]) -> List[str]:
         """Detect suspicious indicators in content"""
-        detected = []
-        content_lower = content.lower()
-        
-        for indicator in self.suspicious_indicators:
-            if indicator in content_lower:
-                detected.append(indicator)
-        
-        return detected
+        return AnalyzedDocument.of(content).keyword_hits.found('fact_check.suspicious')
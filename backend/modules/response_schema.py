@@ -0,0 +1,76 @@
+"""
+Structured Gemini responses
+JSON schemas requested from Gemini in structured-output mode and a strict
+validator for what comes back
+"""
+from typing import Any, Dict, List
+
+_ANALYSIS_PROPERTIES = {
+    'risk_score': {'type': 'integer', 'description': 'Misinformation or manipulation risk from 0 to 100'},
+    'red_flags': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Up to 3 key problems'},
+    'explanation': {'type': 'string', 'description': 'Brief explanation of the score'},
+    'verification_steps': {'type': 'array', 'items': {'type': 'string'},
+                           'description': '1-2 steps a reader can take to verify the content'}
+}
+
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': _ANALYSIS_PROPERTIES,
+    'required': list(_ANALYSIS_PROPERTIES)
+}
+
+# Multi-item prompts: one object per numbered input, tagged with its number
+BATCH_ANALYSIS_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {'item': {'type': 'integer'}, **_ANALYSIS_PROPERTIES},
+        'required': ['item', *_ANALYSIS_PROPERTIES]
+    }
+}
+
+
+def _require_string_list(value: Any, field: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(entry, str) for entry in value):
+        raise ValueError(f"'{field}' must be a list of strings")
+    return [entry.strip() for entry in value if entry.strip()]
+
+
+def validate_analysis(data: Any, extra_fields: tuple = ()) -> Dict:
+    """
+    Check a decoded response against ANALYSIS_SCHEMA
+
+    Args:
+        data: Value decoded from the model's JSON output
+        extra_fields: Additional required integer fields (e.g. 'item' in batches)
+
+    Returns:
+        The analysis with list entries stripped of blanks
+
+    Raises:
+        ValueError: If a field is missing, unexpected, of the wrong type or out of range
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Response must be a JSON object')
+    expected = set(_ANALYSIS_PROPERTIES) | set(extra_fields)
+    missing = expected - data.keys()
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(sorted(missing))}")
+    unexpected = data.keys() - expected
+    if unexpected:
+        raise ValueError(f"Unexpected fields: {', '.join(sorted(unexpected))}")
+
+    for field in ('risk_score', *extra_fields):
+        # bool is an int subclass but never a valid score
+        if not isinstance(data[field], int) or isinstance(data[field], bool):
+            raise ValueError(f"'{field}' must be an integer")
+    if not 0 <= data['risk_score'] <= 100:
+        raise ValueError("'risk_score' must be between 0 and 100")
+    if not isinstance(data['explanation'], str):
+        raise ValueError("'explanation' must be a string")
+
+    analysis = dict(data)
+    analysis['red_flags'] = _require_string_list(data['red_flags'], 'red_flags')
+    analysis['verification_steps'] = _require_string_list(data['verification_steps'], 'verification_steps')
+    analysis['explanation'] = data['explanation'].strip()
+    return analysis
@@ -0,0 +1,63 @@
+"""
+Request coalescing
+Concurrent calls for the same key share one execution: the first caller
+does the work and the rest wait for its result
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+from .metrics import metrics
+
+
+class SingleFlight:
+    """Deduplicates in-flight work by key"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Prefix of the '<name>.coalesced' counter in the metrics registry
+        """
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run func for key unless a call for the same key is already running,
+        in which case wait for and return that call's result (or exception)
+
+        Args:
+            key: Identity of the work
+            func: Callable doing the work
+
+        Returns:
+            The result of func, shared with any coalesced callers
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            metrics.increment(f'{self.name}.coalesced')
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on"""
+        with self._lock:
+            return len(self._calls)
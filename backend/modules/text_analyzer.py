@@ -1,8 +1,11 @@
 import re
 import string
-from typing import Dict, List
+from typing import Dict, List, Union
 import logging
 
+from .document import AnalyzedDocument
+from .keyword_engine import KeywordHits, get_keyword_engine
+
 logger = logging.getLogger(__name__)
 
 class TextAnalyzer:
@@ -42,50 +45,69 @@ class TextAnalyzer:
             'guaranteed', 'proven fact', 'undeniable', 'obvious',
             'clearly', 'obviously', 'everyone knows'
         ]
+        
+        # Extreme sentiment words (polarization check)
+        self.extreme_positive_words = ['amazing', 'fantastic', 'incredible', 'wonderful', 'excellent', 'perfect']
+        self.extreme_negative_words = ['terrible', 'awful', 'horrible', 'disgusting', 'hate', 'worst', 'destroy']
+        
+        # General sentiment words (sentiment details)
+        self.positive_words = ['good', 'great', 'amazing', 'fantastic', 'excellent', 'wonderful', 'love', 'like']
+        self.negative_words = ['bad', 'terrible', 'awful', 'horrible', 'hate', 'dislike', 'worst', 'horrible']
+        
+        # Register keyword lists with the shared single-pass engine
+        self.keyword_engine = get_keyword_engine()
+        self.keyword_engine.register('text.emotional', self.emotional_keywords)
+        self.keyword_engine.register('text.unreliable', self.unreliable_indicators)
+        self.keyword_engine.register('text.certainty', self.certainty_words)
+        self.keyword_engine.register('text.extreme_positive', self.extreme_positive_words)
+        self.keyword_engine.register('text.extreme_negative', self.extreme_negative_words)
+        self.keyword_engine.register('text.positive', self.positive_words)
+        self.keyword_engine.register('text.negative', self.negative_words)
     
-    def analyze(self, text: str) -> Dict:
+    def analyze(self, text: Union[str, AnalyzedDocument]) -> Dict:
         """
         Analyze text for misinformation indicators
         
         Args:
-            text: The text content to analyze
+            text: The text content to analyze, or a shared AnalyzedDocument
             
         Returns:
             Dictionary containing analysis results
         """
         try:
-            text_lower = text.lower()
+            doc = AnalyzedDocument.of(text)
+            keyword_hits = doc.keyword_hits
             
             # Initialize analysis results
             red_flags = []
             risk_score = 0
             
             # Check for emotional manipulation
-            emotional_score = self._check_emotional_manipulation(text_lower, red_flags)
+            emotional_score = self._check_emotional_manipulation(keyword_hits, red_flags)
             risk_score += emotional_score
             
             # Check for clickbait patterns
-            clickbait_score = self._check_clickbait_patterns(text_lower, red_flags)
+            clickbait_score = self._check_clickbait_patterns(doc.lower, red_flags)
             risk_score += clickbait_score
             
             # Check for unreliable source indicators
-            source_score = self._check_source_reliability(text_lower, red_flags)
+            source_score = self._check_source_reliability(keyword_hits, red_flags)
             risk_score += source_score
             
             # Check language certainty
-            certainty_score = self._check_certainty_language(text_lower, red_flags)
+            certainty_score = self._check_certainty_language(keyword_hits, red_flags)
             risk_score += certainty_score
             
             # Sentiment analysis
-            sentiment_score = self._analyze_sentiment(text, red_flags)
+            sentiment_score = self._analyze_sentiment(doc, red_flags)
             risk_score += sentiment_score
             
             # Grammar and spelling check
-            grammar_score = self._check_grammar_quality(text, red_flags)
+            grammar_score = self._check_grammar_quality(doc, red_flags)
             risk_score += grammar_score
             
             # Length and structure analysis
-            structure_score = self._analyze_structure(text, red_flags)
+            structure_score = self._analyze_structure(doc, red_flags)
             risk_score += structure_score
             
             # Normalize risk score to 0-100
@@ -103,8 +125,8 @@ class TextAnalyzer:
                     'grammar_quality': grammar_score,
                     'structure': structure_score
                 },
-                'word_count': len(text.split()),
-                'sentiment': self._get_sentiment_details(text)
+                'word_count': doc.word_count,
+                'sentiment': self._get_sentiment_details(doc)
             }
             
         except Exception as e:
@@ -117,15 +139,10 @@ class TextAnalyzer:
                 'sentiment': {}
             }
     
-    def _check_emotional_manipulation(self, text: str, red_flags: List[str]) -> int:
+    def _check_emotional_manipulation(self, keyword_hits: KeywordHits, red_flags: List[str]) -> int:
         """Check for emotional manipulation keywords"""
-        score = 0
-        found_keywords = []
-        
-        for keyword in self.emotional_keywords:
-            if keyword in text:
-                found_keywords.append(keyword)
-                score += 10
+        found_keywords = keyword_hits.found('text.emotional')
+        score = len(found_keywords) * 10
         
         if found_keywords:
             red_flags.append(f"Emotional manipulation detected: {', '.join(found_keywords[:3])}")
@@ -147,51 +164,34 @@ class TextAnalyzer:
         
         return min(score, 30)  # Cap at 30 points
     
-    def _check_source_reliability(self, text: str, red_flags: List[str]) -> int:
+    def _check_source_reliability(self, keyword_hits: KeywordHits, red_flags: List[str]) -> int:
         """Check for unreliable source indicators"""
-        score = 0
-        found_indicators = []
-        
-        for indicator in self.unreliable_indicators:
-            if indicator in text:
-                found_indicators.append(indicator)
-                score += 12
+        found_indicators = keyword_hits.found('text.unreliable')
+        score = len(found_indicators) * 12
         
         if found_indicators:
             red_flags.append(f"Unreliable source indicators: {', '.join(found_indicators[:2])}")
         
         return min(score, 25)  # Cap at 25 points
     
-    def _check_certainty_language(self, text: str, red_flags: List[str]) -> int:
+    def _check_certainty_language(self, keyword_hits: KeywordHits, red_flags: List[str]) -> int:
         """Check for overconfident language"""
-        score = 0
-        found_words = []
-        
-        for word in self.certainty_words:
-            if word in text:
-                found_words.append(word)
-                score += 8
+        found_words = keyword_hits.found('text.certainty')
+        score = len(found_words) * 8
         
         if found_words:
             red_flags.append(f"Overconfident language detected: {', '.join(found_words[:3])}")
         
         return min(score, 20)  # Cap at 20 points
     
-    def _analyze_sentiment(self, text: str, red_flags: List[str]) -> int:
+    def _analyze_sentiment(self, doc: AnalyzedDocument, red_flags: List[str]) -> int:
         """Analyze sentiment for extreme polarization using keyword-based approach"""
         try:
-            text_lower = text.lower()
-            
-            # Positive sentiment words
-            positive_words = ['amazing', 'fantastic', 'incredible', 'wonderful', 'excellent', 'perfect']
-            # Negative sentiment words
-            negative_words = ['terrible', 'awful', 'horrible', 'disgusting', 'hate', 'worst', 'destroy']
-            
-            pos_count = sum(1 for word in positive_words if word in text_lower)
-            neg_count = sum(1 for word in negative_words if word in text_lower)
+            pos_count = doc.keyword_hits.count('text.extreme_positive')
+            neg_count = doc.keyword_hits.count('text.extreme_negative')
             
             total_sentiment = pos_count + neg_count
-            words_count = len(text.split())
+            words_count = doc.word_count
             
             if words_count > 0 and total_sentiment > words_count * 0.15:  # More than 15% sentiment words
                 red_flags.append("High emotional content detected")
@@ -206,11 +206,11 @@ class TextAnalyzer:
             logger.error(f"Error in sentiment analysis: {str(e)}")
             return 0
     
-    def _check_grammar_quality(self, text: str, red_flags: List[str]) -> int:
+    def _check_grammar_quality(self, doc: AnalyzedDocument, red_flags: List[str]) -> int:
         """Check grammar and spelling quality"""
         try:
             # Count obvious spelling errors (basic check)
-            words = text.split()
+            words = doc.tokens
             if len(words) < 5:
                 return 0
             
@@ -218,7 +218,7 @@ class TextAnalyzer:
             mixed_words = sum(1 for word in words if any(c.isdigit() for c in word) and any(c.isalpha() for c in word))
             
             # Count excessive punctuation
-            punct_count = sum(1 for c in text if c in '!?')
+            punct_count = doc.char_counts['exclamation'] + doc.char_counts['question']
             
             score = 0
             if mixed_words > len(words) * 0.1:  # More than 10% mixed words
@@ -235,23 +235,24 @@ class TextAnalyzer:
             logger.error(f"Error in grammar check: {str(e)}")
             return 0
     
-    def _analyze_structure(self, text: str, red_flags: List[str]) -> int:
+    def _analyze_structure(self, doc: AnalyzedDocument, red_flags: List[str]) -> int:
         """Analyze text structure for suspicious patterns"""
         score = 0
+        text = doc.text
         
         # Check for very short content
-        if len(text.split()) < 10:
+        if doc.word_count < 10:
             red_flags.append("Very short content")
             score += 10
         
         # Check for excessive capitalization
-        caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+        caps_ratio = doc.char_counts['upper'] / len(text) if text else 0
         if caps_ratio > 0.3:
             red_flags.append("Excessive capitalization")
             score += 15
         
         # Check for repetitive content
-        words = text.lower().split()
+        words = doc.lower_tokens
         if len(words) > 10:
             unique_words = set(words)
             repetition_ratio = 1 - (len(unique_words) / len(words))
@@ -261,19 +262,13 @@ class TextAnalyzer:
         
         return score
     
-    def _get_sentiment_details(self, text: str) -> Dict:
+    def _get_sentiment_details(self, doc: AnalyzedDocument) -> Dict:
         """Get detailed sentiment analysis using keyword-based approach"""
         try:
-            text_lower = text.lower()
-            
-            # Simple keyword-based sentiment
-            positive_words = ['good', 'great', 'amazing', 'fantastic', 'excellent', 'wonderful', 'love', 'like']
-            negative_words = ['bad', 'terrible', 'awful', 'horrible', 'hate', 'dislike', 'worst', 'horrible']
-            
-            pos_count = sum(1 for word in positive_words if word in text_lower)
-            neg_count = sum(1 for word in negative_words if word in text_lower)
+            pos_count = doc.keyword_hits.count('text.positive')
+            neg_count = doc.keyword_hits.count('text.negative')
             
-            total_words = len(text.split())
+            total_words = doc.word_count
             if total_words == 0:
                 return {'polarity': 0, 'subjectivity': 0, 'interpretation': 'No content'}
             
@@ -1,13 +1,35 @@
 import requests
 import validators
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+import asyncio
+import os
 import re
-from typing import Dict, List
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
 import logging
 
+from .async_runtime import get_background_loop
+from .cache import TTLCache
+from .disk_cache import get_disk_cache
+from .html_extractor import extract_page_features, resolve_backend
+from .http_cache import conditional_headers, freshness_lifetime, is_storable, normalize_url
+from .metrics import metrics
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Content types worth parsing; pages without a Content-Type header are parsed too
+HTML_MEDIA_TYPES = {'text/html', 'application/xhtml+xml'}
+# Response headers kept with a cached analysis to judge freshness and revalidate it
+_CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date')
+
+class PageRejected(Exception):
+    """Raised when a page is skipped without being parsed"""
+
 class URLAnalyzer:
     """Analyzes URLs and their content for misinformation indicators"""
     
@@ -33,10 +55,44 @@ class URLAnalyzer:
             r'[0-9]+[a-z]+[0-9]+\.',  # Mixed numbers and letters
         ]
         
+        # Bulk analysis: total and per-host fetches in flight, and the time allowed per URL
+        self.batch_max_concurrency = int(os.getenv('URL_BATCH_MAX_CONCURRENCY', 16))
+        self.batch_per_host = int(os.getenv('URL_BATCH_PER_HOST', 2))
+        self.batch_item_timeout = float(os.getenv('URL_BATCH_ITEM_TIMEOUT', 30))
+        self.batch_pool = ThreadPoolExecutor(max_workers=self.batch_max_concurrency,
+                                             thread_name_prefix='url-batch')
+        # asyncio primitives belong to one loop; rebuilt if the loop restarts after a fork
+        self._slots_loop = None
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, list] = {}
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Keep-alive connections for many hosts, enough per host for concurrent fetches
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=max(10, self.batch_per_host))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Successful page analyses keyed by normalized URL, with the response
+        # headers needed to revalidate them, persisted on disk
+        self.fresh_ttl = float(os.getenv('URL_CACHE_TTL', 3600))
+        self.revalidate_ttl = float(os.getenv('URL_CACHE_REVALIDATE_TTL', 86400))
+        self.content_cache = TTLCache(
+            max_entries=int(os.getenv('URL_CACHE_SIZE', 1000)),
+            ttl=self.fresh_ttl,
+            max_bytes=int(os.getenv('URL_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+            name='url_content',
+            disk=get_disk_cache(),
+            namespace='url_content'
+        )
+        self.fetch_flight = SingleFlight('url_fetch')
+        self.max_page_bytes = int(os.getenv('URL_MAX_PAGE_BYTES', 5 * 1024 * 1024))
+        # Main text kept for AI analysis, enough for long-document mode to rank sections
+        self.max_main_text_chars = int(os.getenv('URL_MAIN_TEXT_MAX_CHARS', 10000))
+        # lxml when installed, html.parser otherwise
+        self.html_parser = resolve_backend(os.getenv('HTML_PARSER', 'auto'))
     
     def analyze(self, url: str) -> Dict:
         """
@@ -87,6 +143,8 @@ class URLAnalyzer:
                 'scheme': parsed_url.scheme,
                 'title': content_analysis.get('title', 'Unknown'),
                 'content': content_analysis.get('content', ''),
+                # Cached analyses from before main_text was kept only have the excerpt
+                'main_text': content_analysis.get('main_text', content_analysis.get('content', '')),
                 'meta_info': content_analysis.get('meta_info', {}),
                 'external_links': content_analysis.get('external_links', []),
                 'social_signals': content_analysis.get('social_signals', {})
@@ -101,6 +159,119 @@ class URLAnalyzer:
             logger.error(f"Error analyzing URL {url}: {str(e)}")
             return {'error': f'Analysis error: {str(e)}'}
     
+    def analyze_many(self, urls: List[str], timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Analyze many URLs concurrently; blocking entry point for request threads
+        
+        Args:
+            urls: URLs to analyze
+            timeout: Seconds allowed per URL once its fetch starts (URL_BATCH_ITEM_TIMEOUT by default)
+            
+        Returns:
+            The analyze() result for each URL, in input order; a URL that runs
+            out of time gets an {'error': ...} result instead
+        """
+        return [future.result() for future in self.submit_many(urls, timeout)]
+    
+    def submit_many(self, urls: List[str], timeout: Optional[float] = None) -> List[Future]:
+        """
+        Start analyzing many URLs concurrently without waiting for them
+        
+        Args:
+            urls: URLs to analyze
+            timeout: Seconds allowed per URL once its fetch starts (URL_BATCH_ITEM_TIMEOUT by default)
+            
+        Returns:
+            One future per URL, in input order, resolving to what analyze_many
+            returns for it; cancelling one that hasn't started skips its fetch
+        """
+        timeout = self.batch_item_timeout if timeout is None else timeout
+        metrics.increment('url_batch.items', len(urls))
+        event_loop = get_background_loop()
+        futures: List[Optional[Future]] = [None] * len(urls)
+        # Start hosts in turn, so one domain's queue doesn't hold up the others
+        for index in self._interleave_by_host(urls):
+            futures[index] = event_loop.submit(self._analyze_limited(urls[index], timeout))
+        return futures
+    
+    @staticmethod
+    def _interleave_by_host(urls: List[str]) -> List[int]:
+        """URL indices ordered round-robin across hosts, keeping input order within a host"""
+        by_host: 'OrderedDict[str, List[int]]' = OrderedDict()
+        for index, url in enumerate(urls):
+            by_host.setdefault(urlparse(url).netloc.lower(), []).append(index)
+        queues = list(by_host.values())
+        order = []
+        for position in range(max((len(queue) for queue in queues), default=0)):
+            order.extend(queue[position] for queue in queues if position < len(queue))
+        return order
+    
+    async def _analyze_limited(self, url: str, timeout: float) -> Dict:
+        """Run analyze() on the batch pool within the global and per-host limits"""
+        host = urlparse(url).netloc.lower()
+        global_slots = self._batch_slots()
+        host_slots = self._acquire_host_entry(host)
+        try:
+            # Wait for the host first, so URLs queued behind a busy host don't hold global slots
+            await host_slots.acquire()
+            try:
+                await global_slots.acquire()
+            except BaseException:
+                host_slots.release()
+                raise
+        except BaseException:
+            self._release_host_entry(host)
+            raise
+        
+        def release(_):
+            global_slots.release()
+            host_slots.release()
+            self._release_host_entry(host)
+        
+        future = asyncio.get_running_loop().run_in_executor(self.batch_pool, self.analyze, url)
+        # Slots stay taken until the fetch really ends, even after its caller stopped waiting
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            metrics.increment('url_batch.timeouts')
+            logger.warning(f"URL analysis of {url} timed out after {timeout:g}s")
+            return {'error': f'Analysis timed out after {timeout:g} seconds'}
+        except Exception as e:
+            logger.error(f"Error analyzing URL {url}: {str(e)}")
+            return {'error': f'Analysis error: {str(e)}'}
+    
+    def _batch_slots(self) -> asyncio.Semaphore:
+        """Global fetch semaphore bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._global_slots = asyncio.Semaphore(self.batch_max_concurrency)
+            self._host_slots = {}
+            self._slots_loop = loop
+        return self._global_slots
+    
+    def _acquire_host_entry(self, host: str) -> asyncio.Semaphore:
+        """Per-host semaphore, kept only while some URL of the host is queued or running"""
+        entry = self._host_slots.get(host)
+        if entry is None:
+            entry = self._host_slots[host] = [asyncio.Semaphore(self.batch_per_host), 0]
+        entry[1] += 1
+        return entry[0]
+    
+    def _release_host_entry(self, host: str) -> None:
+        entry = self._host_slots[host]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._host_slots[host]
+    
+    def batch_stats(self) -> Dict:
+        """Bulk analysis limits and the number of hosts with URLs queued or being fetched"""
+        return {
+            'max_concurrency': self.batch_max_concurrency,
+            'per_host': self.batch_per_host,
+            'active_hosts': len(self._host_slots)
+        }
+    
     def _check_domain_reputation(self, domain: str, red_flags: List[str]) -> int:
         """Check domain against known lists"""
         score = 0
@@ -163,79 +334,186 @@ class URLAnalyzer:
         return score
     
     def _fetch_and_analyze_content(self, url: str, red_flags: List[str]) -> Dict:
-        """Fetch and analyze page content"""
+        """Fetch and analyze page content, reusing a cached analysis of the same page while it is fresh"""
+        key = normalize_url(url)
+        cached = self.content_cache.get(key)
+        if cached is not None and 'analysis' not in cached:
+            # Written before response headers were stored; refetch
+            cached = None
+        if cached is not None and cached['fresh_until'] > time.time():
+            metrics.increment('url_fetch.fresh_hits')
+            red_flags.extend(cached['red_flags'])
+            return dict(cached['analysis'])
+        
+        # Concurrent analyses of the same page share one download or revalidation
+        content_analysis, page_flags = self.fetch_flight.do(key, lambda: self._fetch_and_cache(url, key, cached))
+        red_flags.extend(page_flags)
+        return content_analysis
+    
+    def _fetch_and_cache(self, url: str, key: str, cached: Optional[Dict]) -> Tuple[Dict, List[str]]:
+        """Fetch or revalidate and analyze a page, caching the analysis unless the server forbids it"""
+        page_flags = []
+        content_analysis, headers = self._fetch_and_analyze_page(url, page_flags, cached)
+        
+        # Failed fetches are retried on the next request rather than cached
+        if headers is None:
+            return content_analysis, page_flags
+        
+        if not is_storable(headers):
+            metrics.increment('url_fetch.no_store')
+            self.content_cache.delete(key)
+            return content_analysis, page_flags
+        
+        fresh_for = freshness_lifetime(headers, default=self.fresh_ttl, maximum=self.fresh_ttl)
+        # Stale entries are only worth keeping if they can be revalidated
+        revalidatable = 'ETag' in headers or 'Last-Modified' in headers
+        keep_for = fresh_for + (self.revalidate_ttl if revalidatable else 0)
+        if keep_for > 0:
+            self.content_cache.set(key, {
+                'analysis': content_analysis,
+                'red_flags': page_flags,
+                'headers': {name: headers[name] for name in _CACHED_HEADERS if name in headers},
+                'fresh_until': time.time() + fresh_for
+            }, ttl=keep_for)
+        else:
+            self.content_cache.delete(key)
+        return content_analysis, page_flags
+    
+    def _fetch_and_analyze_page(self, url: str, red_flags: List[str],
+                                cached: Optional[Dict] = None) -> Tuple[Dict, Optional[Mapping[str, str]]]:
+        """
+        Fetch and analyze page content
+        
+        A cached entry is revalidated with a conditional request, and on
+        304 Not Modified its analysis is reused without downloading or
+        parsing the page
+        
+        Returns:
+            (content analysis, response headers (merged with the cached ones
+             on 304), or None when the page could not be fetched)
+        """
         try:
-            # Set timeout and size limits
-            response = self.session.get(url, timeout=10, stream=True)
-            
-            # Check response size (limit to 5MB)
-            content_length = response.headers.get('Content-Length')
-            if content_length and int(content_length) > 5 * 1024 * 1024:
-                return {'score': 0, 'error': 'Content too large'}
-            
-            # Get first 5MB of content
-            content = b''
-            for chunk in response.iter_content(chunk_size=8192):
-                content += chunk
-                if len(content) > 5 * 1024 * 1024:
-                    break
+            request_headers = {}
+            if cached is not None:
+                stored = cached['headers']
+                request_headers = conditional_headers(stored.get('ETag'), stored.get('Last-Modified'))
+            
+            content, headers = self._download_page(url, request_headers)
+            if content is None:
+                metrics.increment('url_fetch.not_modified')
+                # A 304 updates the stored headers it repeats (RFC 9111 4.3.4)
+                merged = CaseInsensitiveDict(cached['headers'])
+                merged.update({name: headers[name] for name in _CACHED_HEADERS if name in headers})
+                red_flags.extend(cached['red_flags'])
+                return dict(cached['analysis']), merged
+            
+            return self.analyze_page_html(content, url, red_flags), headers
+            
+        except PageRejected as e:
+            logger.info(f"Skipped content of {url}: {str(e)}")
+            return {'score': 0, 'error': str(e)}, None
+        except requests.RequestException as e:
+            logger.error(f"Request error fetching content: {str(e)}")
+            return {'score': 20, 'error': str(e)}, None
+        except Exception as e:
+            logger.error(f"Error analyzing content: {str(e)}")
+            return {'score': 10, 'error': str(e)}, None
+    
+    def analyze_page_html(self, content: bytes, url: str, red_flags: List[str],
+                          backend: Optional[str] = None) -> Dict:
+        """
+        Analyze a downloaded page
+        
+        Args:
+            content: Page body
+            url: Page URL, used to tell external links apart
+            red_flags: List to append the page's red flags to
+            backend: HTML parser backend (the configured one by default)
             
-            response._content = content
+        Returns:
+            Content score, title, content excerpt, main text (for AI analysis),
+            meta info, links and social signals
+        """
+        # Collect every feature in one pass over the markup
+        features = extract_page_features(content, backend=backend or self.html_parser)
+        
+        # Extract basic information
+        title_text = features['title'].strip() if features['title'] is not None else 'No title'
+        
+        # Extract main content
+        content_text = self._extract_main_content(features)
+        
+        # Extract meta information
+        meta_info = self._extract_meta_info(features)
+        
+        # Check for content quality indicators
+        score = self._analyze_page_content(features, content_text, red_flags)
+        
+        # Extract external links
+        external_links = self._extract_external_links(features['links'], url)
+        
+        # Check for social media signals
+        social_signals = self._check_social_signals(features)
+        
+        return {
+            'score': score,
+            'title': title_text,
+            'content': content_text[:1000],  # Limit content length
+            'main_text': content_text[:self.max_main_text_chars],
+            'meta_info': meta_info,
+            'external_links': external_links[:10],  # Limit links
+            'social_signals': social_signals
+        }
+    
+    def _download_page(self, url: str,
+                       headers: Optional[Dict[str, str]] = None) -> Tuple[Optional[bytes], Mapping[str, str]]:
+        """
+        Download an HTML page body, at most max_page_bytes of it
+        
+        The status and Content-Type are checked before any of the body is read
+        
+        Args:
+            url: Page URL
+            headers: Extra request headers (conditional ones when revalidating)
+        
+        Returns:
+            (page body, or None on 304 Not Modified, response headers)
+        
+        Raises:
+            PageRejected: If the page is too large or not HTML
+            requests.RequestException: On network or HTTP errors
+        """
+        with self.session.get(url, timeout=10, stream=True, headers=headers) as response:
             response.raise_for_status()
+            if response.status_code == 304:
+                return None, response.headers
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract basic information
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else 'No title'
-            
-            # Extract main content
-            content_text = self._extract_main_content(soup)
-            
-            # Extract meta information
-            meta_info = self._extract_meta_info(soup)
-            
-            # Check for content quality indicators
-            score = self._analyze_page_content(soup, content_text, red_flags)
-            
-            # Extract external links
-            external_links = self._extract_external_links(soup, url)
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > self.max_page_bytes:
+                raise PageRejected('Content too large')
             
-            # Check for social media signals
-            social_signals = self._check_social_signals(soup)
+            media_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if media_type and media_type not in HTML_MEDIA_TYPES:
+                metrics.increment('url_fetch.rejected_content_type')
+                raise PageRejected(f'Unsupported content type: {media_type}')
             
-            return {
-                'score': score,
-                'title': title_text,
-                'content': content_text[:1000],  # Limit content length
-                'meta_info': meta_info,
-                'external_links': external_links[:10],  # Limit links
-                'social_signals': social_signals
-            }
+            # bytearray appends are amortized O(1), unlike bytes concatenation
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                content += chunk
+                if len(content) >= self.max_page_bytes:
+                    del content[self.max_page_bytes:]
+                    metrics.increment('url_fetch.truncated')
+                    break
             
-        except requests.RequestException as e:
-            logger.error(f"Request error fetching content: {str(e)}")
-            return {'score': 20, 'error': str(e)}
-        except Exception as e:
-            logger.error(f"Error analyzing content: {str(e)}")
-            return {'score': 10, 'error': str(e)}
+        metrics.increment('url_fetch.bytes', len(content))
+        return bytes(content), response.headers
     
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    def _extract_main_content(self, features: Dict) -> str:
         """Extract main text content from page"""
         try:
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-            
-            # Try to find main content areas
-            main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|article|post|main'))
-            
-            if main_content:
-                text = main_content.get_text()
-            else:
-                # Fallback to body text
-                text = soup.get_text()
+            # Main/article/content element text, or the whole page without script, style and navigation
+            text = features['main_text']
             
             # Clean up text
             lines = (line.strip() for line in text.splitlines())
@@ -248,31 +526,30 @@ class URLAnalyzer:
             logger.error(f"Error extracting content: {str(e)}")
             return ""
     
-    def _extract_meta_info(self, soup: BeautifulSoup) -> Dict:
+    def _extract_meta_info(self, features: Dict) -> Dict:
         """Extract meta information from page"""
         meta_info = {}
+        meta = features['meta']
         
         try:
             # Extract author
-            author = soup.find('meta', {'name': 'author'}) or soup.find('meta', {'property': 'article:author'})
-            if author:
+            author = meta.get('author') or meta.get('article_author')
+            if author is not None:
                 meta_info['author'] = author.get('content', '')
             
             # Extract publication date
-            pub_date = soup.find('meta', {'property': 'article:published_time'}) or \
-                      soup.find('meta', {'name': 'publish-date'}) or \
-                      soup.find('time')
-            if pub_date:
+            pub_date = meta.get('published_time') or meta.get('publish_date') or features['time']
+            if pub_date is not None:
                 meta_info['published'] = pub_date.get('content') or pub_date.get('datetime', '')
             
             # Extract description
-            description = soup.find('meta', {'name': 'description'}) or soup.find('meta', {'property': 'og:description'})
-            if description:
+            description = meta.get('description') or meta.get('og_description')
+            if description is not None:
                 meta_info['description'] = description.get('content', '')
             
             # Extract keywords
-            keywords = soup.find('meta', {'name': 'keywords'})
-            if keywords:
+            keywords = meta.get('keywords')
+            if keywords is not None:
                 meta_info['keywords'] = keywords.get('content', '')
                 
         except Exception as e:
@@ -280,52 +557,43 @@ class URLAnalyzer:
         
         return meta_info
     
-    def _analyze_page_content(self, soup: BeautifulSoup, content: str, red_flags: List[str]) -> int:
+    def _analyze_page_content(self, features: Dict, content: str, red_flags: List[str]) -> int:
         """Analyze page content for quality indicators"""
         score = 0
         
-        try:
-            # Check content length
-            if len(content) < 200:
-                red_flags.append("Very short article content")
-                score += 20
-            
-            # Check for excessive ads
-            ad_indicators = soup.find_all(['iframe', 'ins', 'div'], class_=re.compile(r'ad|advertisement|banner|popup'))
-            if len(ad_indicators) > 10:
-                red_flags.append("Excessive advertisements detected")
-                score += 15
-            
-            # Check for missing author information
-            author_info = soup.find_all(['meta', 'span', 'div'], attrs={'name': re.compile(r'author'), 'class': re.compile(r'author|byline')})
-            if not author_info:
-                red_flags.append("No author information found")
-                score += 12
-            
-            # Check for missing publication date
-            date_info = soup.find_all(['meta', 'time', 'span'], attrs={'name': re.compile(r'date|publish'), 'class': re.compile(r'date|publish|time')})
-            if not date_info:
-                red_flags.append("No publication date found")
-                score += 10
-            
-            # Check for comment sections (engagement indicator)
-            comments = soup.find_all(['div', 'section'], class_=re.compile(r'comment|discuss'))
-            if not comments:
-                score += 5  # Minor flag, not always available
-                
-        except Exception as e:
-            logger.error(f"Error analyzing page content: {str(e)}")
+        # Check content length
+        if len(content) < 200:
+            red_flags.append("Very short article content")
+            score += 20
+        
+        # Check for excessive ads
+        if features['ad_count'] > 10:
+            red_flags.append("Excessive advertisements detected")
+            score += 15
+        
+        # Check for missing author information
+        if not features['has_author_markup']:
+            red_flags.append("No author information found")
+            score += 12
+        
+        # Check for missing publication date
+        if not features['has_date_markup']:
+            red_flags.append("No publication date found")
+            score += 10
+        
+        # Check for comment sections (engagement indicator)
+        if not features['has_comments']:
+            score += 5  # Minor flag, not always available
         
         return score
     
-    def _extract_external_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract external links from the page"""
+    def _extract_external_links(self, links: List[str], base_url: str) -> List[str]:
+        """Extract external links from the page's hrefs"""
         try:
             external_links = []
             base_domain = urlparse(base_url).netloc
             
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for href in links:
                 full_url = urljoin(base_url, href)
                 parsed = urlparse(full_url)
                 
@@ -341,32 +609,10 @@ class URLAnalyzer:
             logger.error(f"Error extracting external links: {str(e)}")
             return []
     
-    def _check_social_signals(self, soup: BeautifulSoup) -> Dict:
+    def _check_social_signals(self, features: Dict) -> Dict:
         """Check for social media sharing buttons and signals"""
-        try:
-            social_signals = {
-                'sharing_buttons': False,
-                'social_meta': False,
-                'embedded_social': False
-            }
-            
-            # Check for sharing buttons
-            sharing_elements = soup.find_all(['a', 'div', 'button'], class_=re.compile(r'share|social|twitter|facebook'))
-            if sharing_elements:
-                social_signals['sharing_buttons'] = True
-            
-            # Check for Open Graph meta tags
-            og_tags = soup.find_all('meta', property=re.compile(r'^og:'))
-            if og_tags:
-                social_signals['social_meta'] = True
-            
-            # Check for embedded social content
-            embedded_social = soup.find_all(['iframe', 'blockquote'], class_=re.compile(r'twitter|facebook|instagram'))
-            if embedded_social:
-                social_signals['embedded_social'] = True
-            
-            return social_signals
-            
-        except Exception as e:
-            logger.error(f"Error checking social signals: {str(e)}")
-            return {}
+        return {
+            'sharing_buttons': features['sharing_buttons'],
+            'social_meta': features['social_meta'],
+            'embedded_social': features['embedded_social']
+        }
@@ -185,10 +185,9 @@ async function handleTextAnalysis(event) {
     showLoading();
     
     try {
-        console.log('Making request to:', `${API_BASE_URL}/api/analyze/text`);
-        console.log('Request body:', JSON.stringify({ text: text }));
+        console.log('Making request to:', `${API_BASE_URL}/api/analyze/text/stream`);
         
-        const response = await fetch(`${API_BASE_URL}/api/analyze/text`, {
+        const response = await fetch(`${API_BASE_URL}/api/analyze/text/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -197,16 +196,14 @@ async function handleTextAnalysis(event) {
         });
 
         console.log('Response status:', response.status);
-        console.log('Response ok:', response.ok);
         
-        const result = await response.json();
-        console.log('Response data:', result);
-        
-        if (response.ok) {
-            displayResults(result);
-        } else {
+        if (!response.ok) {
+            const result = await response.json();
             showError(result.error || 'An error occurred during analysis.');
+            return;
         }
+        
+        await readAnalysisStream(response, text);
     } catch (error) {
         console.error('Error details:', error);
         console.error('Error message:', error.message);
@@ -217,6 +214,74 @@ async function handleTextAnalysis(event) {
     }
 }
 
+// Read server-sent events from the streaming text endpoint. The basic layer
+// is rendered as a preliminary result as soon as it arrives; the composite
+// result replaces it once every layer has finished.
+async function readAnalysisStream(response, text) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        
+        for (const rawEvent of events) {
+            const event = parseServerSentEvent(rawEvent);
+            if (!event) continue;
+            
+            if (event.type === 'layer') {
+                console.log('Layer completed:', event.data.layer);
+                if (event.data.layer === 'basic') {
+                    displayPreliminaryResults(text, event.data.result);
+                }
+            } else if (event.type === 'result') {
+                console.log('Response data:', event.data);
+                displayResults(event.data);
+            } else if (event.type === 'error') {
+                showError(event.data.error || 'An error occurred during analysis.');
+            }
+        }
+    }
+}
+
+function parseServerSentEvent(rawEvent) {
+    let type = 'message';
+    const dataLines = [];
+    
+    rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            type = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            dataLines.push(line.slice(5).trim());
+        }
+    });
+    
+    if (dataLines.length === 0) return null;
+    return { type: type, data: JSON.parse(dataLines.join('\n')) };
+}
+
+function displayPreliminaryResults(text, basicAnalysis) {
+    loadingOverlay.style.display = 'none';
+    
+    displayResults({
+        type: 'text',
+        content: text,
+        risk_score: basicAnalysis.risk_score,
+        analysis: { basic: basicAnalysis },
+        red_flags: basicAnalysis.red_flags,
+        educational_tips: [],
+        verification_suggestions: []
+    });
+    
+    const riskExplanation = document.getElementById('risk-explanation');
+    riskExplanation.textContent += ' (Preliminary result; AI and fact-checking layers are still running.)';
+}
+
 async function handleUrlAnalysis(event) {
     event.preventDefault();
     
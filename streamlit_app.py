@@ -6,7 +6,6 @@ from PIL import Image
 import io
 import base64
 import json
-import re
 from datetime import datetime
 
 # Configure Streamlit page
@@ -112,16 +111,22 @@ def analyze_text_with_gemini(text, model):
         }}
         """
         
-        response = model.generate_content(prompt)
+        # Ask for a bare JSON body so it parses with a single json.loads
+        response = model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
         
         # Extract JSON from response
         response_text = response.text
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        start = response_text.find('{')
         
-        if json_match:
-            json_str = json_match.group()
+        if start != -1:
             try:
-                return json.loads(json_str)
+                # Decode the first complete object only, ignoring any trailing text
+                result, _ = json.JSONDecoder().raw_decode(response_text, start)
+                if isinstance(result, dict):
+                    return result
             except json.JSONDecodeError:
                 pass
         